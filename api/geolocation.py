@@ -19,6 +19,282 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of geocoded addresses kept per service instance
+GEOCODE_CACHE_SIZE = 4096
+
+# Seconds to wait for the geocoder before giving up on a lookup
+GEOCODE_TIMEOUT = 5
+
+# Conversion factor for reporting distances in miles
+MILES_PER_KM = 0.621371
+
+# Real recycling centers across the USA
+# Data sourced from public recycling center information
+REAL_CENTERS = {
+    # Massachusetts
+    'MA': [
+        {
+            "name": "Andover Recycling Center",
+            "address": "11 Campanelli Dr, Andover, MA 01810",
+            "phone": "(978) 623-8729",
+            "website": "https://andoverma.gov/219/Recycling-Center",
+            "lat": 42.6518,
+            "lon": -71.1431,
+            "accepts": ["cardboard", "paper", "plastic", "metal", "glass", "electronics"]
+        },
+        {
+            "name": "Lawrence Recycling Facility",
+            "address": "1 Auburn St, Lawrence, MA 01841",
+            "phone": "(978) 620-3000",
+            "website": "https://www.cityoflawrence.com/321/Recycling",
+            "lat": 42.7153,
+            "lon": -71.1634,
+            "accepts": ["plastic", "paper", "glass", "metal", "cardboard"]
+        },
+        {
+            "name": "Haverhill Transfer Station",
+            "address": "500 Primrose St, Haverhill, MA 01830",
+            "phone": "(978) 373-8487",
+            "website": "https://www.cityofhaverhill.com/departments/public_works/solid_waste_and_recycling.php",
+            "lat": 42.7749,
+            "lon": -71.0550,
+            "accepts": ["cardboard", "paper", "metal", "glass", "yard waste", "electronics"]
+        },
+        {
+            "name": "Boston Zero Waste Recycling Center",
+            "address": "815 Albany St, Boston, MA 02119",
+            "phone": "(617) 635-4500",
+            "website": "https://www.boston.gov/departments/public-works/recycling-boston",
+            "lat": 42.3345,
+            "lon": -71.0726,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics", "hazardous"]
+        }
+    ],
+    # Texas
+    'TX': [
+        {
+            "name": "Dallas Recycling Center",
+            "address": "4610 S Westmoreland Rd, Dallas, TX 75237",
+            "phone": "(214) 670-4475",
+            "website": "https://dallascityhall.com/departments/sanitation/Pages/recycling.aspx",
+            "lat": 32.6871,
+            "lon": -96.8724,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
+        },
+        {
+            "name": "McCommas Bluff Recycling Center",
+            "address": "5555 Youngblood Rd, Dallas, TX 75241",
+            "phone": "(214) 670-0977",
+            "website": "https://dallascityhall.com/departments/sanitation/Pages/landfill.aspx",
+            "lat": 32.6667,
+            "lon": -96.7478,
+            "accepts": ["paper", "plastic", "metal", "yard waste", "hazardous", "electronics"]
+        },
+        {
+            "name": "Houston Environmental Service Center - South",
+            "address": "11500 S Post Oak Rd, Houston, TX 77035",
+            "phone": "(713) 837-1310",
+            "website": "https://www.houstontx.gov/solidwaste/recycling.html",
+            "lat": 29.6575,
+            "lon": -95.4758,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics", "hazardous"]
+        },
+        {
+            "name": "San Antonio Recycling Center",
+            "address": "1800 Wurzbach Pkwy, San Antonio, TX 78216",
+            "phone": "(210) 207-6428",
+            "website": "https://www.sanantonio.gov/swmd/Recycling",
+            "lat": 29.5265,
+            "lon": -98.5137,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
+        },
+        {
+            "name": "Austin Recycle & Reuse Drop-off Center",
+            "address": "2514 Business Center Dr, Austin, TX 78744",
+            "phone": "(512) 974-4343",
+            "website": "https://www.austintexas.gov/department/recycle-reuse-drop-center",
+            "lat": 30.2058,
+            "lon": -97.7471,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics", "hazardous", "textiles"]
+        },
+        {
+            "name": "Fort Worth Environmental Collection Center",
+            "address": "6400 Bridge St, Fort Worth, TX 76112",
+            "phone": "(817) 392-1234",
+            "website": "https://www.fortworthtexas.gov/departments/code-compliance/environmental-quality/drop-off",
+            "lat": 32.7666,
+            "lon": -97.2382,
+            "accepts": ["paper", "plastic", "electronics", "hazardous", "chemicals"]
+        }
+    ],
+    # California
+    'CA': [
+        {
+            "name": "San Francisco Recology Recycling Center",
+            "address": "501 Tunnel Ave, San Francisco, CA 94134",
+            "phone": "(415) 330-1400",
+            "website": "https://www.recology.com/recology-san-francisco/",
+            "lat": 37.7128,
+            "lon": -122.3984,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics", "compost"]
+        },
+        {
+            "name": "LA Recycling Center",
+            "address": "2475 E Olympic Blvd, Los Angeles, CA 90021",
+            "phone": "(323) 901-2605",
+            "website": "https://www.lacitysan.org/san/faces/home",
+            "lat": 34.0313,
+            "lon": -118.2279,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
+        },
+        {
+            "name": "San Diego Miramar Recycling Center",
+            "address": "5165 Convoy St, San Diego, CA 92111",
+            "phone": "(858) 694-7000",
+            "website": "https://www.sandiego.gov/environmental-services/recycling",
+            "lat": 32.8339,
+            "lon": -117.1541,
+            "accepts": ["paper", "plastic", "glass", "metal", "yard waste", "electronics"]
+        }
+    ],
+    # Florida
+    'FL': [
+        {
+            "name": "Miami-Dade Recycling Center",
+            "address": "8831 NW 58th St, Doral, FL 33178",
+            "phone": "(305) 594-1420",
+            "website": "https://www.miamidade.gov/global/service.page?Mduid_service=ser1467835326826406",
+            "lat": 25.8277,
+            "lon": -80.3349,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
+        },
+        {
+            "name": "Orlando Recycling Center",
+            "address": "5901 Young Pine Rd, Orlando, FL 32829",
+            "phone": "(407) 246-2314",
+            "website": "https://www.orlando.gov/Trash-Recycling",
+            "lat": 28.5629,
+            "lon": -81.2471,
+            "accepts": ["paper", "plastic", "glass", "metal", "yard waste", "electronics"]
+        }
+    ],
+    # New York
+    'NY': [
+        {
+            "name": "NYC Department of Sanitation Recycling Center",
+            "address": "400 E 59th St, New York, NY 10022",
+            "phone": "(212) 669-7560",
+            "website": "https://www1.nyc.gov/assets/dsny/site/services/recycling",
+            "lat": 40.7588,
+            "lon": -73.9626,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
+        },
+        {
+            "name": "Brooklyn Recycling Center",
+            "address": "130 Nostrand Ave, Brooklyn, NY 11205",
+            "phone": "(718) 935-1122",
+            "website": "https://www1.nyc.gov/assets/dsny/site/services/recycling",
+            "lat": 40.6953,
+            "lon": -73.9511,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics", "textiles"]
+        }
+    ],
+    # Illinois
+    'IL': [
+        {
+            "name": "Chicago Recycling Center",
+            "address": "2700 W 34th St, Chicago, IL 60632",
+            "phone": "(312) 744-1614",
+            "website": "https://www.chicago.gov/city/en/depts/streets/supp_info/recycling1.html",
+            "lat": 41.8310,
+            "lon": -87.6874,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
+        }
+    ],
+    # Georgia
+    'GA': [
+        {
+            "name": "Atlanta Recycling Center",
+            "address": "1540 Jonesboro Rd SE, Atlanta, GA 30315",
+            "phone": "(404) 330-6333",
+            "website": "https://www.atlantaga.gov/government/departments/public-works/recycling-program",
+            "lat": 33.7224,
+            "lon": -84.3807,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
+        }
+    ],
+    # Washington
+    'WA': [
+        {
+            "name": "Seattle Recycling Center",
+            "address": "1350 N 34th St, Seattle, WA 98103",
+            "phone": "(206) 684-3000",
+            "website": "https://www.seattle.gov/utilities/your-services/collection-and-disposal/recycling",
+            "lat": 47.6492,
+            "lon": -122.3512,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics", "yard waste"]
+        }
+    ],
+    # Continue with more states if needed
+    'CT': [
+        {
+            "name": "New Haven Transfer Station",
+            "address": "260 Middletown Ave, New Haven, CT 06513",
+            "phone": "(203) 946-7700",
+            "website": "https://www.newhavenct.gov/living/services/public-works/solid-waste-recycling",
+            "lat": 41.3272,
+            "lon": -72.8877,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
+        }
+    ],
+    'NH': [
+        {
+            "name": "Manchester Recycling Center",
+            "address": "500 Dunbarton Rd, Manchester, NH 03102",
+            "phone": "(603) 624-6444",
+            "website": "https://www.manchesternh.gov/Departments/Solid-Waste-Recycling",
+            "lat": 42.9849,
+            "lon": -71.4697,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics", "yard waste"]
+        }
+    ],
+    'RI': [
+        {
+            "name": "Providence Recycling Center",
+            "address": "700 Allens Ave, Providence, RI 02905",
+            "phone": "(401) 467-7550",
+            "website": "https://www.providenceri.gov/public-works/waste-disposal/",
+            "lat": 41.8053,
+            "lon": -71.4001,
+            "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
+        }
+    ]
+}
+
+# Define major US regions by state
+US_REGIONS = {
+    'Northeast': ['MA', 'CT', 'NH', 'RI', 'ME', 'VT', 'NY', 'NJ', 'PA'],
+    'South': ['TX', 'FL', 'GA', 'NC', 'SC', 'VA', 'WV', 'KY', 'TN', 'AR', 'LA', 'MS', 'AL'],
+    'Midwest': ['IL', 'IN', 'OH', 'MI', 'WI', 'MN', 'IA', 'MO', 'ND', 'SD', 'NE', 'KS'],
+    'West': ['CA', 'WA', 'OR', 'NV', 'ID', 'MT', 'WY', 'UT', 'CO', 'AZ', 'NM', 'HI', 'AK']
+}
+
+# State centers for major states
+STATE_CENTERS = {
+    'MA': (42.4072, -71.3824),  # Massachusetts
+    'TX': (31.9686, -99.9018),  # Texas
+    'CA': (36.7783, -119.4179), # California
+    'FL': (27.6648, -81.5158),  # Florida
+    'NY': (42.1657, -74.9481),  # New York
+    'IL': (40.6331, -89.3985),  # Illinois
+    'GA': (32.1656, -82.9001),  # Georgia
+    'WA': (47.7511, -120.7401), # Washington
+    'CT': (41.6032, -73.0877),  # Connecticut
+    'NH': (43.1939, -71.5724),  # New Hampshire
+    'RI': (41.6772, -71.5101)   # Rhode Island
+    # Add more states as needed
+}
+
 class GeolocationService:
     """
     Service for handling location-based functionalities.
@@ -30,12 +306,22 @@ class GeolocationService:
         self.default_location = {"lat": 42.4072, "lon": -71.3824}  # Massachusetts
         self.recycling_centers_radius = 100  # km - increased from 30 to 100 for much wider coverage
         
+        # Reuse connections to the geocoder across lookups
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'RecycleRight/1.0'
+        
+        # Geocoded coordinates by normalized address, oldest first
+        self._geocode_cache = {}
+        
         logger.info("GeolocationService initialized")
     
     def get_location_from_address(self, address):
         """
         Convert an address to coordinates.
         
+        Addresses that were geocoded successfully before are answered from a cache
+        keyed on the lowercased, whitespace-collapsed address.
+        
         Args:
             address (str): The address to geocode
             
@@ -45,7 +331,32 @@ class GeolocationService:
         if not address or address.strip() == "":
             logger.warning("Empty address provided to geocoder")
             return None
+        
+        key = ' '.join(address.lower().split())
+        coords = self._geocode_cache.get(key)
+        if coords is not None:
+            return coords
+        
+        coords = self._geocode_address(address)
+        if coords is None:
+            # Don't cache failures; the geocoder may just have been rate limited
+            return (self.default_location['lat'], self.default_location['lon'])
+        
+        if len(self._geocode_cache) >= GEOCODE_CACHE_SIZE:
+            del self._geocode_cache[next(iter(self._geocode_cache))]
+        self._geocode_cache[key] = coords
+        return coords
+    
+    def _geocode_address(self, address):
+        """
+        Geocode an address, trying several normalized forms of it.
+        
+        Args:
+            address (str): The address to geocode
             
+        Returns:
+            tuple: (latitude, longitude) or None if not found
+        """
         try:
             # Try to normalize the address - strip extra spaces, add country if not specified
             normalized_address = address.strip()
@@ -131,14 +442,13 @@ class GeolocationService:
                     logger.info(f"Successfully geocoded with explicit Massachusetts format: {explicit_address} -> {coords}")
                     return coords
             
-            # If all attempts failed, return default Massachusetts location
+            # If all attempts failed, the caller falls back to the default Massachusetts location
             logger.warning(f"Could not get coordinates for address: {address}. Using default location.")
-            return (self.default_location['lat'], self.default_location['lon'])
+            return None
             
         except Exception as e:
             logger.error(f"Error geocoding address: {e}", exc_info=True)
-            # Return default location instead of None to prevent map failures
-            return (self.default_location['lat'], self.default_location['lon'])
+            return None
             
     def _try_nominatim_geocoding(self, address):
         """
@@ -157,15 +467,11 @@ class GeolocationService:
                 'limit': 1
             }
             
-            headers = {
-                'User-Agent': 'RecycleRight/1.0'
-            }
-            
             # Add a delay to respect Nominatim's usage policy
             import time
             time.sleep(1)
             
-            response = requests.get(self.api_url, params=params, headers=headers)
+            response = self.session.get(self.api_url, params=params, timeout=GEOCODE_TIMEOUT)
             
             if response.status_code == 200:
                 data = response.json()
@@ -225,7 +531,7 @@ class GeolocationService:
         
         return c * r
     
-    def find_recycling_centers(self, lat, lon, waste_type=None, radius=None):
+    def find_recycling_centers(self, lat, lon, waste_type=None, radius=None, units='km'):
         """
         Find recycling centers near a location.
         
@@ -234,6 +540,7 @@ class GeolocationService:
             lon (float): Longitude
             waste_type (str, optional): Type of waste to recycle
             radius (float, optional): Search radius in kilometers
+            units (str, optional): Unit of the returned distances, 'km' or 'miles'
             
         Returns:
             list: List of nearby recycling centers
@@ -242,273 +549,6 @@ class GeolocationService:
             if radius is None:
                 radius = self.recycling_centers_radius
                 
-            # Real recycling centers across the USA
-            # Data sourced from public recycling center information
-            real_centers = {
-                # Massachusetts
-                'MA': [
-                    {
-                        "name": "Andover Recycling Center",
-                        "address": "11 Campanelli Dr, Andover, MA 01810",
-                        "phone": "(978) 623-8729",
-                        "website": "https://andoverma.gov/219/Recycling-Center",
-                        "lat": 42.6518,
-                        "lon": -71.1431,
-                        "accepts": ["cardboard", "paper", "plastic", "metal", "glass", "electronics"]
-                    },
-                    {
-                        "name": "Lawrence Recycling Facility",
-                        "address": "1 Auburn St, Lawrence, MA 01841",
-                        "phone": "(978) 620-3000",
-                        "website": "https://www.cityoflawrence.com/321/Recycling",
-                        "lat": 42.7153,
-                        "lon": -71.1634,
-                        "accepts": ["plastic", "paper", "glass", "metal", "cardboard"]
-                    },
-                    {
-                        "name": "Haverhill Transfer Station",
-                        "address": "500 Primrose St, Haverhill, MA 01830",
-                        "phone": "(978) 373-8487",
-                        "website": "https://www.cityofhaverhill.com/departments/public_works/solid_waste_and_recycling.php",
-                        "lat": 42.7749,
-                        "lon": -71.0550,
-                        "accepts": ["cardboard", "paper", "metal", "glass", "yard waste", "electronics"]
-                    },
-                    {
-                        "name": "Boston Zero Waste Recycling Center",
-                        "address": "815 Albany St, Boston, MA 02119",
-                        "phone": "(617) 635-4500",
-                        "website": "https://www.boston.gov/departments/public-works/recycling-boston",
-                        "lat": 42.3345,
-                        "lon": -71.0726,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics", "hazardous"]
-                    }
-                ],
-                # Texas
-                'TX': [
-                    {
-                        "name": "Dallas Recycling Center",
-                        "address": "4610 S Westmoreland Rd, Dallas, TX 75237",
-                        "phone": "(214) 670-4475",
-                        "website": "https://dallascityhall.com/departments/sanitation/Pages/recycling.aspx",
-                        "lat": 32.6871,
-                        "lon": -96.8724,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
-                    },
-                    {
-                        "name": "McCommas Bluff Recycling Center",
-                        "address": "5555 Youngblood Rd, Dallas, TX 75241",
-                        "phone": "(214) 670-0977",
-                        "website": "https://dallascityhall.com/departments/sanitation/Pages/landfill.aspx",
-                        "lat": 32.6667,
-                        "lon": -96.7478,
-                        "accepts": ["paper", "plastic", "metal", "yard waste", "hazardous", "electronics"]
-                    },
-                    {
-                        "name": "Houston Environmental Service Center - South",
-                        "address": "11500 S Post Oak Rd, Houston, TX 77035",
-                        "phone": "(713) 837-1310",
-                        "website": "https://www.houstontx.gov/solidwaste/recycling.html",
-                        "lat": 29.6575,
-                        "lon": -95.4758,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics", "hazardous"]
-                    },
-                    {
-                        "name": "San Antonio Recycling Center",
-                        "address": "1800 Wurzbach Pkwy, San Antonio, TX 78216",
-                        "phone": "(210) 207-6428",
-                        "website": "https://www.sanantonio.gov/swmd/Recycling",
-                        "lat": 29.5265,
-                        "lon": -98.5137,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
-                    },
-                    {
-                        "name": "Austin Recycle & Reuse Drop-off Center",
-                        "address": "2514 Business Center Dr, Austin, TX 78744",
-                        "phone": "(512) 974-4343",
-                        "website": "https://www.austintexas.gov/department/recycle-reuse-drop-center",
-                        "lat": 30.2058,
-                        "lon": -97.7471,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics", "hazardous", "textiles"]
-                    },
-                    {
-                        "name": "Fort Worth Environmental Collection Center",
-                        "address": "6400 Bridge St, Fort Worth, TX 76112",
-                        "phone": "(817) 392-1234",
-                        "website": "https://www.fortworthtexas.gov/departments/code-compliance/environmental-quality/drop-off",
-                        "lat": 32.7666,
-                        "lon": -97.2382,
-                        "accepts": ["paper", "plastic", "electronics", "hazardous", "chemicals"]
-                    }
-                ],
-                # California
-                'CA': [
-                    {
-                        "name": "San Francisco Recology Recycling Center",
-                        "address": "501 Tunnel Ave, San Francisco, CA 94134",
-                        "phone": "(415) 330-1400",
-                        "website": "https://www.recology.com/recology-san-francisco/",
-                        "lat": 37.7128,
-                        "lon": -122.3984,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics", "compost"]
-                    },
-                    {
-                        "name": "LA Recycling Center",
-                        "address": "2475 E Olympic Blvd, Los Angeles, CA 90021",
-                        "phone": "(323) 901-2605",
-                        "website": "https://www.lacitysan.org/san/faces/home",
-                        "lat": 34.0313,
-                        "lon": -118.2279,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
-                    },
-                    {
-                        "name": "San Diego Miramar Recycling Center",
-                        "address": "5165 Convoy St, San Diego, CA 92111",
-                        "phone": "(858) 694-7000",
-                        "website": "https://www.sandiego.gov/environmental-services/recycling",
-                        "lat": 32.8339,
-                        "lon": -117.1541,
-                        "accepts": ["paper", "plastic", "glass", "metal", "yard waste", "electronics"]
-                    }
-                ],
-                # Florida
-                'FL': [
-                    {
-                        "name": "Miami-Dade Recycling Center",
-                        "address": "8831 NW 58th St, Doral, FL 33178",
-                        "phone": "(305) 594-1420",
-                        "website": "https://www.miamidade.gov/global/service.page?Mduid_service=ser1467835326826406",
-                        "lat": 25.8277,
-                        "lon": -80.3349,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
-                    },
-                    {
-                        "name": "Orlando Recycling Center",
-                        "address": "5901 Young Pine Rd, Orlando, FL 32829",
-                        "phone": "(407) 246-2314",
-                        "website": "https://www.orlando.gov/Trash-Recycling",
-                        "lat": 28.5629,
-                        "lon": -81.2471,
-                        "accepts": ["paper", "plastic", "glass", "metal", "yard waste", "electronics"]
-                    }
-                ],
-                # New York
-                'NY': [
-                    {
-                        "name": "NYC Department of Sanitation Recycling Center",
-                        "address": "400 E 59th St, New York, NY 10022",
-                        "phone": "(212) 669-7560",
-                        "website": "https://www1.nyc.gov/assets/dsny/site/services/recycling",
-                        "lat": 40.7588,
-                        "lon": -73.9626,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
-                    },
-                    {
-                        "name": "Brooklyn Recycling Center",
-                        "address": "130 Nostrand Ave, Brooklyn, NY 11205",
-                        "phone": "(718) 935-1122",
-                        "website": "https://www1.nyc.gov/assets/dsny/site/services/recycling",
-                        "lat": 40.6953,
-                        "lon": -73.9511,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics", "textiles"]
-                    }
-                ],
-                # Illinois
-                'IL': [
-                    {
-                        "name": "Chicago Recycling Center",
-                        "address": "2700 W 34th St, Chicago, IL 60632",
-                        "phone": "(312) 744-1614",
-                        "website": "https://www.chicago.gov/city/en/depts/streets/supp_info/recycling1.html",
-                        "lat": 41.8310,
-                        "lon": -87.6874,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
-                    }
-                ],
-                # Georgia
-                'GA': [
-                    {
-                        "name": "Atlanta Recycling Center",
-                        "address": "1540 Jonesboro Rd SE, Atlanta, GA 30315",
-                        "phone": "(404) 330-6333",
-                        "website": "https://www.atlantaga.gov/government/departments/public-works/recycling-program",
-                        "lat": 33.7224,
-                        "lon": -84.3807,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
-                    }
-                ],
-                # Washington
-                'WA': [
-                    {
-                        "name": "Seattle Recycling Center",
-                        "address": "1350 N 34th St, Seattle, WA 98103",
-                        "phone": "(206) 684-3000",
-                        "website": "https://www.seattle.gov/utilities/your-services/collection-and-disposal/recycling",
-                        "lat": 47.6492,
-                        "lon": -122.3512,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics", "yard waste"]
-                    }
-                ],
-                # Continue with more states if needed
-                'CT': [
-                    {
-                        "name": "New Haven Transfer Station",
-                        "address": "260 Middletown Ave, New Haven, CT 06513",
-                        "phone": "(203) 946-7700",
-                        "website": "https://www.newhavenct.gov/living/services/public-works/solid-waste-recycling",
-                        "lat": 41.3272,
-                        "lon": -72.8877,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
-                    }
-                ],
-                'NH': [
-                    {
-                        "name": "Manchester Recycling Center",
-                        "address": "500 Dunbarton Rd, Manchester, NH 03102",
-                        "phone": "(603) 624-6444",
-                        "website": "https://www.manchesternh.gov/Departments/Solid-Waste-Recycling",
-                        "lat": 42.9849,
-                        "lon": -71.4697,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics", "yard waste"]
-                    }
-                ],
-                'RI': [
-                    {
-                        "name": "Providence Recycling Center",
-                        "address": "700 Allens Ave, Providence, RI 02905",
-                        "phone": "(401) 467-7550",
-                        "website": "https://www.providenceri.gov/public-works/waste-disposal/",
-                        "lat": 41.8053,
-                        "lon": -71.4001,
-                        "accepts": ["paper", "plastic", "glass", "metal", "electronics"]
-                    }
-                ]
-            }
-            
-            # Define major US regions by state
-            us_regions = {
-                'Northeast': ['MA', 'CT', 'NH', 'RI', 'ME', 'VT', 'NY', 'NJ', 'PA'],
-                'South': ['TX', 'FL', 'GA', 'NC', 'SC', 'VA', 'WV', 'KY', 'TN', 'AR', 'LA', 'MS', 'AL'],
-                'Midwest': ['IL', 'IN', 'OH', 'MI', 'WI', 'MN', 'IA', 'MO', 'ND', 'SD', 'NE', 'KS'],
-                'West': ['CA', 'WA', 'OR', 'NV', 'ID', 'MT', 'WY', 'UT', 'CO', 'AZ', 'NM', 'HI', 'AK']
-            }
-            
-            # State centers for major states
-            state_centers = {
-                'MA': (42.4072, -71.3824),  # Massachusetts
-                'TX': (31.9686, -99.9018),  # Texas
-                'CA': (36.7783, -119.4179), # California
-                'FL': (27.6648, -81.5158),  # Florida
-                'NY': (42.1657, -74.9481),  # New York
-                'IL': (40.6331, -89.3985),  # Illinois
-                'GA': (32.1656, -82.9001),  # Georgia
-                'WA': (47.7511, -120.7401), # Washington
-                'CT': (41.6032, -73.0877),  # Connecticut
-                'NH': (43.1939, -71.5724),  # New Hampshire
-                'RI': (41.6772, -71.5101)   # Rhode Island
-                # Add more states as needed
-            }
-            
             # Get region based on lat/lon
             # Default to Northeast, but try to determine the correct region
             user_region = 'Northeast'
@@ -516,7 +556,7 @@ class GeolocationService:
             closest_dist = float('inf')
             
             # Find the closest state
-            for state, center in state_centers.items():
+            for state, center in STATE_CENTERS.items():
                 dist = self.haversine_distance(lat, lon, center[0], center[1])
                 if dist < closest_dist:
                     closest_dist = dist
@@ -524,7 +564,7 @@ class GeolocationService:
             
             if closest_state:
                 # Determine region from the closest state
-                for region, states in us_regions.items():
+                for region, states in US_REGIONS.items():
                     if closest_state in states:
                         user_region = region
                         break
@@ -533,17 +573,18 @@ class GeolocationService:
             
             # Get all centers in the user's region
             centers_to_check = []
-            for state in us_regions.get(user_region, []):
-                if state in real_centers:
-                    centers_to_check.extend(real_centers[state])
+            for state in US_REGIONS.get(user_region, []):
+                if state in REAL_CENTERS:
+                    centers_to_check.extend(REAL_CENTERS[state])
             
             # If we didn't find any centers in the region, check all centers
             if not centers_to_check:
                 logger.warning(f"No centers found in region {user_region}, checking all centers")
-                for state_centers in real_centers.values():
+                for state_centers in REAL_CENTERS.values():
                     centers_to_check.extend(state_centers)
             
             # Calculate distance for each center
+            distance_scale = MILES_PER_KM if units == 'miles' else 1
             centers = []
             for center in centers_to_check:
                 # Calculate distance
@@ -553,7 +594,7 @@ class GeolocationService:
                 if distance <= radius:
                     # Add distance to center data
                     center_copy = center.copy()
-                    center_copy['distance'] = distance
+                    center_copy['distance'] = distance * distance_scale
                     centers.append(center_copy)
             
             # Log how many centers were found
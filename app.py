@@ -10,10 +10,26 @@ import os
 import logging
 import json
 import uuid
+import numpy as np
 from werkzeug.utils import secure_filename
 from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, send_from_directory
+from jinja2 import FileSystemBytecodeCache
 from dotenv import load_dotenv
 
+# orjson is optional; without it responses are encoded with the standard json module
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:
+    orjson = None
+
+# Flask-Session is optional; without it (or without REDIS_URL) sessions live in the signed cookie
+try:
+    import redis
+    from flask_session import Session
+except ImportError:
+    Session = None
+
 # Load environment variables
 load_dotenv()
 
@@ -41,6 +57,28 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+if orjson is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        """JSON provider that encodes with orjson, keeping Flask's output for dates and sorted keys."""
+        
+        @staticmethod
+        def default(o):
+            # orjson only serializes numpy arrays and the common scalar types natively
+            if isinstance(o, np.generic):
+                return o.item()
+            return DefaultJSONProvider.default(o)
+        
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(
+                obj,
+                default=self.default,
+                option=(orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                        | orjson.OPT_SERIALIZE_NUMPY)
+            ).decode()
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
 def create_app():
     """Create and configure the Flask application."""
     # Create Flask application
@@ -55,6 +93,19 @@ def create_app():
     # Set secret key
     app.secret_key = config.SECRET_KEY
 
+    # Keep session data in Redis so the cookie only carries the session ID
+    if Session is not None and config.REDIS_URL:
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = redis.Redis.from_url(config.REDIS_URL)
+        Session(app)
+
+    # Encode jsonify() responses with orjson when it is installed
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+    # Share compiled templates between worker processes and restarts
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(config.JINJA_CACHE_DIR)
+
     # Copy config values explicitly
     app.config['MODEL_PATH'] = config.MODEL_PATH
     app.config['LABELS_PATH'] = config.LABELS_PATH
@@ -111,11 +162,6 @@ def create_app():
     app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload
 
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-
-    def allowed_file(filename):
-        return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
     # Make services available to the routes
     app.config['database'] = db
     app.config['waste_classifier'] = classifier
@@ -26,12 +26,16 @@ NORMALIZE_STD = [0.229, 0.224, 0.225]
 
 # Classifier settings
 CONFIDENCE_THRESHOLD = 0.7  # Minimum confidence score for valid classification
+NUM_THREADS = None  # TFLite interpreter threads (None lets TFLite decide)
 
 # Geolocation settings
 DEFAULT_LOCATION = {"lat": 37.7749, "lon": -122.4194}  # Default location (San Francisco)
 GEOCODING_API_URL = "https://nominatim.openstreetmap.org/search"
 RECYCLING_CENTERS_RADIUS = 10  # km
 
+# Password hashing (werkzeug method string; older hashes are upgraded on login)
+PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+
 # User settings
 POINTS_PER_SCAN = 5
 POINTS_PER_CORRECT_DISPOSAL = 10
@@ -40,4 +44,7 @@ MAX_DAILY_POINTS = 100
 # Gamification settings
 DAILY_CHALLENGE_COUNT = 3
 WEEKLY_CHALLENGE_COUNT = 5
-ACHIEVEMENT_LEVELS = ["Beginner", "Intermediate", "Advanced", "Expert", "Master"] 
\ No newline at end of file
+ACHIEVEMENT_LEVELS = ["Beginner", "Intermediate", "Advanced", "Expert", "Master"] 
+
+# Demo settings
+DEMO_SLEEP = True  # Pause between simulated scans; disable when benchmarking the demo flow
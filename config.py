@@ -19,6 +19,29 @@ DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
 # Database settings
 DB_URI = os.getenv('MONGODB_URI')
 DB_NAME = os.getenv('MONGODB_NAME', 'recycleright')
+DB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 2000))
+DB_CONNECT_TIMEOUT_MS = int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', 2000))
+DB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 2000))  # wait for a pooled connection
+
+# Cache settings (optional Redis in front of MongoDB user and leaderboard lookups)
+REDIS_URL = os.getenv('REDIS_URL')
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))  # seconds
+LEADERBOARD_CACHE_TTL = int(os.getenv('LEADERBOARD_CACHE_TTL', 60))  # seconds
+GUIDELINES_CACHE_TTL = int(os.getenv('GUIDELINES_CACHE_TTL', 3600))  # seconds
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 60))  # seconds
+
+# Background scan analysis (uploads made with ?async=1)
+SCAN_WORKERS = int(os.getenv('SCAN_WORKERS', 4))
+SCAN_RESULT_TTL = int(os.getenv('SCAN_RESULT_TTL', 600))  # seconds
+SCAN_CACHE_TTL = int(os.getenv('SCAN_CACHE_TTL', 86400))  # seconds to reuse the analysis of an identical image
+
+# Threads for dashboard queries that run alongside each other
+DASHBOARD_WORKERS = int(os.getenv('DASHBOARD_WORKERS', 8))
+
+# Password hashing (werkzeug method string; older hashes are upgraded on login).
+# scrypt with N=2**15, r=8 uses 32 MiB and takes roughly 100-150 ms per hash on a
+# server core; keep it at or above that rather than lowering it for login latency.
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
 
 # File upload settings
 UPLOAD_FOLDER = os.path.join(BASE_DIR, os.getenv('UPLOAD_FOLDER', 'uploads'))
@@ -29,13 +52,23 @@ try:
 except (ValueError, AttributeError):
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # Default to 16MB
 
-ALLOWED_EXTENSIONS = set(os.getenv('ALLOWED_EXTENSIONS', 'png,jpg,jpeg').split(','))
+ALLOWED_EXTENSIONS = frozenset(os.getenv('ALLOWED_EXTENSIONS', 'png,jpg,jpeg').split(','))
+
+# Template bytecode cache directory (None uses a per-user temporary directory)
+JINJA_CACHE_DIR = os.getenv('JINJA_CACHE_DIR')
+
+# Response compression (used when Flask-Compress is installed)
+COMPRESS_ALGORITHM = ['br', 'gzip']
+COMPRESS_LEVEL = 4
+COMPRESS_BR_LEVEL = 4
+COMPRESS_MIN_SIZE = 512
 
 # Model settings
 MODEL_PATH = os.getenv('MODEL_PATH', 'models/waste_classifier.tflite')
 # Define both possible paths for labels - the code will check both paths
 LABELS_PATH = os.getenv('LABELS_PATH', 'models/labels/waste_labels.txt')
 LABELS_PATH_ALT = os.path.join('models', 'labels', 'waste_labels.txt')
+NUM_THREADS = int(os.getenv('NUM_THREADS')) if os.getenv('NUM_THREADS') else None  # TFLite interpreter threads
 
 # Points system
 POINTS_PER_SCAN = int(os.getenv('POINTS_PER_SCAN', 5))
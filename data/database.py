@@ -5,15 +5,24 @@ Database module for RecycleRight application using MongoDB.
 import logging
 import os
 import json
+import atexit
+import queue
+import threading
 from datetime import datetime
 import pymongo
+from pymongo import monitoring
 from bson.objectid import ObjectId
 import hashlib
-import math
 import time
 from urllib.parse import quote_plus
 import random
 
+# Redis is optional; without it lookups always go to MongoDB
+try:
+    import redis
+except ImportError:
+    redis = None
+
 import config
 
 logger = logging.getLogger(__name__)
@@ -21,6 +30,52 @@ logger = logging.getLogger(__name__)
 # Global database connection
 _db_instance = None
 
+# Scans are written in batches of up to this many documents, at most this many seconds apart
+SCAN_FLUSH_BATCH = 200
+SCAN_FLUSH_INTERVAL = 0.05
+
+# Failed scan writes are retried after this many seconds, doubling up to the maximum
+SCAN_RETRY_DELAY = 0.5
+SCAN_RETRY_MAX_DELAY = 30
+
+# Seconds close() waits for the flusher to finish its current batch
+SCAN_STOP_TIMEOUT = 10
+
+# Attempts close() makes at writing the scans still queued before giving up on them
+SCAN_STOP_RETRIES = 3
+
+# MongoDB error code for a duplicate key
+DUPLICATE_KEY_ERROR = 11000
+
+# Queued by _stop_scan_flusher to wake the flusher thread so it can exit
+_STOP_FLUSHER = object()
+
+# Maximum number of waste types whose guidelines are kept in memory
+GUIDELINES_CACHE_SIZE = 64
+
+# User fields kept in the cache; credentials such as password_hash never leave MongoDB
+CACHED_USER_FIELDS = ("id", "username", "email", "points", "level", "location", "location_lat", "location_lon")
+
+def _encode_cached(value):
+    """JSON fallback for cached values: tag datetimes so they round-trip."""
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+def _decode_cached(obj):
+    """Turn datetimes tagged by _encode_cached back into datetime objects."""
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+def _cache_dumps(value):
+    """Serialize a value for the Redis cache."""
+    return json.dumps(value, default=_encode_cached)
+
+def _cache_loads(data):
+    """Deserialize a value written by _cache_dumps."""
+    return json.loads(data, object_hook=_decode_cached)
+
 def get_db():
     """Get the global database instance."""
     global _db_instance
@@ -30,6 +85,27 @@ def get_db():
         _db_instance = Database(config.DB_URI)
     return _db_instance
 
+class _TopologyState(monitoring.TopologyListener):
+    """Tracks from the driver's server monitoring whether MongoDB can take writes."""
+    
+    def __init__(self):
+        self.available = True
+    
+    def opened(self, event):
+        pass
+    
+    def description_changed(self, event):
+        available = event.new_description.has_writable_server()
+        if available != self.available:
+            if available:
+                logger.info("MongoDB is available again")
+            else:
+                logger.warning("MongoDB has no writable server; failing fast until it recovers")
+        self.available = available
+    
+    def closed(self, event):
+        pass
+
 class Database:
     """Database class for storing and retrieving application data using MongoDB."""
     
@@ -48,10 +124,65 @@ class Database:
         self.logger = logger
         self.connected = False
         self.mock_mode = False
+        self._topology = _TopologyState()
+        
+        # Redis cache for user documents and the leaderboard, shared across workers when configured
+        self.cache = self._connect_cache()
+        
+        # Leaderboards cached in this process when Redis isn't configured: limit -> (expires, leaders)
+        self._leaderboards = {}
+        
+        # Guidelines by normalized waste type: waste_type -> (expires, guidelines or None)
+        self._guidelines = {}
+        
+        # Scans waiting to be written by the background flusher, started on first use
+        self._scan_queue = queue.Queue()
+        self._scan_flusher = None
+        self._scan_flusher_lock = threading.Lock()
+        self._scan_stop = threading.Event()
+        
+        # Queued scans not yet in MongoDB, counted per user so scan counts include them
+        self._pending_scans = {}
+        self._pending_scans_lock = threading.Lock()
         
         # Try to connect immediately
         self.connect()
     
+    def _connect_cache(self):
+        """
+        Connect to the Redis cache if one is configured.
+        
+        Returns:
+            redis.Redis: Client for the cache, or None if it is not available.
+        """
+        if not config.REDIS_URL:
+            return None
+        if redis is None:
+            logger.warning("REDIS_URL is set but the redis package is not installed; cache disabled")
+            return None
+        
+        pool = redis.ConnectionPool.from_url(config.REDIS_URL)
+        logger.info("Using Redis cache")
+        return redis.Redis(connection_pool=pool)
+    
+    def _invalidate_user(self, user_id):
+        """Drop a user's cached document and dashboard data after they change."""
+        if self.cache is None:
+            return
+        try:
+            self.cache.delete(f"user:{user_id}", f"dashboard:{user_id}")
+        except redis.RedisError as e:
+            logger.warning(f"Error invalidating cached user {user_id}: {e}")
+    
+    def _invalidate_dashboard(self, user_id):
+        """Drop a user's cached dashboard after their challenges change."""
+        if self.cache is None:
+            return
+        try:
+            self.cache.delete(f"dashboard:{user_id}")
+        except redis.RedisError as e:
+            logger.warning(f"Error invalidating cached dashboard for {user_id}: {e}")
+    
     def connect(self):
         """Establish a connection to the MongoDB database."""
         try:
@@ -59,12 +190,16 @@ class Database:
                 # Configure MongoDB client with appropriate settings for Atlas
                 self.client = pymongo.MongoClient(
                     self.uri,
-                    serverSelectionTimeoutMS=5000,
-                    connectTimeoutMS=5000,
+                    serverSelectionTimeoutMS=config.DB_SERVER_SELECTION_TIMEOUT_MS,
+                    connectTimeoutMS=config.DB_CONNECT_TIMEOUT_MS,
                     socketTimeoutMS=5000,
                     maxPoolSize=50,
+                    minPoolSize=5,  # Keep connections warm so requests don't pay for a handshake
+                    waitQueueTimeoutMS=config.DB_WAIT_QUEUE_TIMEOUT_MS,
+                    retryReads=True,
                     retryWrites=True,
-                    w='majority'
+                    w='majority',
+                    event_listeners=[self._topology]
                 )
                 
                 # Get database instance
@@ -90,6 +225,16 @@ class Database:
             logger.error(f"Error connecting to MongoDB: {e}", exc_info=True)
             raise
 
+    @property
+    def available(self):
+        """
+        Whether MongoDB is connected and currently has a writable server.
+        
+        Routes check this to fail fast during an outage instead of each request
+        waiting out the server selection timeout.
+        """
+        return self.connected and self._topology.available
+    
     def ensure_connected(self):
         """Ensure database is connected before operations."""
         if not self.connected:
@@ -107,6 +252,7 @@ class Database:
     
     def close(self):
         """Close the database connection."""
+        self._stop_scan_flusher()
         if self.client:
             self.client.close()
             logger.info("MongoDB connection closed")
@@ -126,8 +272,10 @@ class Database:
             # Create indexes
             self.db.users.create_index([("username", pymongo.ASCENDING)], unique=True)
             self.db.users.create_index([("email", pymongo.ASCENDING)], unique=True)
+            self.db.users.create_index([("points", pymongo.DESCENDING)])
             
-            self.db.scans.create_index([("user_id", pymongo.ASCENDING)])
+            # Also serves a user's most recent scans without an in-memory sort
+            self.db.scans.create_index([("user_id", pymongo.ASCENDING), ("timestamp", pymongo.DESCENDING)])
             self.db.scans.create_index([("timestamp", pymongo.DESCENDING)])
             
             self.db.recycling_guidelines.create_index([
@@ -201,37 +349,54 @@ class Database:
             logger.error(f"Error adding user: {e}", exc_info=True)
             return None
     
-    def get_user(self, user_id=None, username=None):
+    def get_user(self, user_id=None, username=None, projection=None):
         """
         Get user information.
         
         Args:
             user_id (str): User ID.
             username (str): Username.
+            projection (dict, optional): MongoDB projection limiting the stored fields
+                returned. location_lat/location_lon are derived from "location".
             
         Returns:
-            dict: User information if found, None otherwise.
+            dict: User information if found, None otherwise. Users looked up by ID may
+                come from the cache, which omits password_hash.
         """
         try:
+            # Users looked up by ID (every authenticated request) are served from the cache.
+            # Cached documents hold every field the routes read by ID, so they also satisfy
+            # the projections used there, but never include password_hash.
+            cache_key = f"user:{user_id}" if user_id and self.cache is not None else None
+            if cache_key:
+                try:
+                    cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        return _cache_loads(cached)
+                except (redis.RedisError, ValueError) as e:
+                    logger.warning(f"Error reading cached user {user_id}: {e}")
+            
             self.ensure_connected()
             
             if user_id:
-                user = self.db.users.find_one({"_id": ObjectId(user_id)})
+                user = self.db.users.find_one({"_id": ObjectId(user_id)}, projection)
             elif username:
-                user = self.db.users.find_one({"username": username})
+                user = self.db.users.find_one({"username": username}, projection)
             else:
                 logger.error("Either user_id or username must be provided")
                 return None
             
             if user:
-                # Convert ObjectId to string for easier handling
-                user["id"] = str(user["_id"])
-                del user["_id"]
+                self._format_user(user)
                 
-                # Extract lat/lon from location document
-                if user.get("location"):
-                    user["location_lat"] = user["location"]["coordinates"][1]
-                    user["location_lon"] = user["location"]["coordinates"][0]
+                # Users are cached by ID, including ones looked up by username at login, so
+                # the requests that follow a login find the user already cached
+                if self.cache is not None and projection is None:
+                    cached_user = {field: user[field] for field in CACHED_USER_FIELDS if field in user}
+                    try:
+                        self.cache.setex(f"user:{user['id']}", config.USER_CACHE_TTL, _cache_dumps(cached_user))
+                    except (redis.RedisError, TypeError) as e:
+                        logger.warning(f"Error caching user {user['id']}: {e}")
                 
                 return user
             return None
@@ -239,6 +404,27 @@ class Database:
             logger.error(f"Error retrieving user: {e}", exc_info=True)
             return None
     
+    def evict_user(self, user_id):
+        """
+        Drop a user's cached data, e.g. when they log out.
+        
+        Args:
+            user_id (str): User ID.
+        """
+        self._invalidate_user(user_id)
+    
+    def _format_user(self, user):
+        """Convert a user document from MongoDB into the form returned by get_user."""
+        # Convert ObjectId to string for easier handling
+        user["id"] = str(user["_id"])
+        del user["_id"]
+        
+        # Extract lat/lon from location document
+        if user.get("location"):
+            user["location_lat"] = user["location"]["coordinates"][1]
+            user["location_lon"] = user["location"]["coordinates"][0]
+        return user
+    
     def update_user_location(self, user_id, location):
         """
         Update a user's location.
@@ -262,6 +448,7 @@ class Database:
             )
             
             if result.modified_count > 0:
+                self._invalidate_user(user_id)
                 logger.info(f"Updated location for user {user_id}")
                 return True
             else:
@@ -271,10 +458,39 @@ class Database:
             logger.error(f"Error updating user location: {e}", exc_info=True)
             return False
     
+    def update_user_password_hash(self, user_id, password_hash):
+        """
+        Replace a user's stored password hash.
+        
+        Args:
+            user_id (str): User ID.
+            password_hash (str): New password hash.
+            
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        try:
+            result = self.db.users.update_one(
+                {"_id": ObjectId(user_id)},
+                {"$set": {"password_hash": password_hash}}
+            )
+            
+            if result.modified_count > 0:
+                self._invalidate_user(user_id)
+                logger.info(f"Updated password hash for user {user_id}")
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Error updating password hash: {e}", exc_info=True)
+            return False
+    
     def record_scan(self, user_id, waste_type, confidence, image_path=None, location=None):
         """
         Record a waste scan in the database.
         
+        The scan is queued and written in the background; count_user_scans and the
+        dashboard include it from the moment it is queued.
+        
         Args:
             user_id (str): User ID.
             waste_type (str): Identified waste type.
@@ -294,6 +510,7 @@ class Database:
                 }
             
             scan_doc = {
+                "_id": ObjectId(),
                 "user_id": ObjectId(user_id),
                 "waste_type": waste_type,
                 "confidence": confidence,
@@ -303,8 +520,9 @@ class Database:
                 "points_earned": 0
             }
             
-            result = self.db.scans.insert_one(scan_doc)
-            scan_id = str(result.inserted_id)
+            # The ID is assigned here, so the caller doesn't wait for the batched insert
+            self._queue_scan(scan_doc)
+            scan_id = str(scan_doc["_id"])
             
             logger.info(f"New scan recorded with ID {scan_id}")
             return scan_id
@@ -312,6 +530,180 @@ class Database:
             logger.error(f"Error recording scan: {e}", exc_info=True)
             return None
     
+    def _queue_scan(self, scan_doc):
+        """Queue a scan document for the background flusher, starting it if needed."""
+        with self._scan_flusher_lock:
+            if self._scan_flusher is None:
+                self._scan_flusher = threading.Thread(
+                    target=self._flush_scans_forever, name="scan-flusher", daemon=True
+                )
+                self._scan_flusher.start()
+                atexit.register(self._stop_scan_flusher)
+        self._track_pending_scans([scan_doc], 1)
+        self._scan_queue.put(scan_doc)
+    
+    def _track_pending_scans(self, docs, delta):
+        """Adjust the per-user count of queued scans by delta for each document."""
+        with self._pending_scans_lock:
+            for doc in docs:
+                user_id = str(doc["user_id"])
+                count = self._pending_scans.get(user_id, 0) + delta
+                if count > 0:
+                    self._pending_scans[user_id] = count
+                else:
+                    self._pending_scans.pop(user_id, None)
+    
+    def _pending_scan_count(self, user_id):
+        """
+        Count a user's scans that are queued but not yet written.
+        
+        Args:
+            user_id (str): User ID.
+            
+        Returns:
+            int: Number of pending scans.
+        """
+        with self._pending_scans_lock:
+            return self._pending_scans.get(str(user_id), 0)
+    
+    def _flush_scans_forever(self):
+        """Write queued scans in batches, retrying failed writes with backoff; runs on the flusher thread."""
+        batch = []
+        delay = SCAN_RETRY_DELAY
+        while True:
+            stopping = self._collect_scans(batch)
+            batch = self._insert_scans(batch) if batch else []
+            if batch and not stopping:
+                logger.warning(f"Retrying {len(batch)} unsaved scans in {delay:.1f}s")
+                stopping = self._scan_stop.wait(delay)
+                delay = min(delay * 2, SCAN_RETRY_MAX_DELAY)
+            else:
+                delay = SCAN_RETRY_DELAY
+            if stopping:
+                # Anything still unsaved is left for _stop_scan_flusher to write
+                for doc in batch:
+                    self._scan_queue.put(doc)
+                return
+    
+    def _collect_scans(self, batch):
+        """
+        Add queued scans to a batch, waiting for the first one if the batch is empty.
+        
+        Args:
+            batch (list): Scan documents to extend in place
+            
+        Returns:
+            bool: True if the flusher has been asked to stop
+        """
+        deadline = None
+        while len(batch) < SCAN_FLUSH_BATCH:
+            if not batch:
+                doc = self._scan_queue.get()
+            else:
+                if deadline is None:
+                    deadline = time.monotonic() + SCAN_FLUSH_INTERVAL
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    doc = self._scan_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            if doc is _STOP_FLUSHER:
+                return True
+            batch.append(doc)
+        return False
+    
+    def _stop_scan_flusher(self):
+        """Stop the flusher thread, waiting for its current batch, then write whatever is still queued."""
+        flusher = self._scan_flusher
+        if flusher is not None and flusher.is_alive():
+            self._scan_stop.set()
+            self._scan_queue.put(_STOP_FLUSHER)
+            flusher.join(timeout=SCAN_STOP_TIMEOUT)
+            if flusher.is_alive():
+                logger.warning("Scan flusher did not stop in time")
+        
+        delay = SCAN_RETRY_DELAY
+        for attempt in range(SCAN_STOP_RETRIES):
+            if not self.flush_scans():
+                return
+            if attempt < SCAN_STOP_RETRIES - 1:
+                time.sleep(delay)
+                delay = min(delay * 2, SCAN_RETRY_MAX_DELAY)
+        
+        lost = []
+        while True:
+            try:
+                doc = self._scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            if doc is not _STOP_FLUSHER:
+                lost.append(str(doc["_id"]))
+        logger.error(f"Giving up on {len(lost)} unsaved scans: {', '.join(lost)}")
+    
+    def flush_scans(self):
+        """
+        Write any queued scans immediately.
+        
+        Returns:
+            int: Number of scans that could not be written; they stay queued
+        """
+        batch = []
+        while True:
+            try:
+                doc = self._scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            if doc is not _STOP_FLUSHER:
+                batch.append(doc)
+        failed = self._insert_scans(batch) if batch else []
+        for doc in failed:
+            self._scan_queue.put(doc)
+        if failed:
+            logger.error(f"{len(failed)} scans could not be written and remain queued")
+        return len(failed)
+    
+    def _insert_scans(self, batch):
+        """
+        Insert a batch of scan documents.
+        
+        Args:
+            batch (list): Scan documents to insert
+            
+        Returns:
+            list: Documents that were not written and should be retried
+        """
+        try:
+            self.db.scans.insert_many(batch, ordered=False)
+            failed = []
+        except pymongo.errors.BulkWriteError as e:
+            # Unordered inserts attempt every document; a duplicate key means the scan
+            # was already written by an earlier attempt, any other error is retried
+            errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY_ERROR]
+            failed_indexes = {error["index"] for error in errors}
+            failed = [doc for index, doc in enumerate(batch) if index in failed_indexes]
+            if errors:
+                logger.error(f"Error writing {len(failed)} of {len(batch)} scans: {errors[0].get('errmsg')}")
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} scans: {e}", exc_info=True)
+            failed = batch
+        
+        failed_ids = {doc["_id"] for doc in failed}
+        written = [doc for doc in batch if doc["_id"] not in failed_ids]
+        if not written:
+            return failed
+        self._track_pending_scans(written, -1)
+        logger.debug(f"Wrote {len(written)} scans")
+        
+        # Scan counts on these users' dashboards are now out of date
+        if self.cache is not None:
+            try:
+                self.cache.delete(*{f"dashboard:{doc['user_id']}" for doc in written})
+            except redis.RedisError as e:
+                logger.warning(f"Error invalidating cached dashboards: {e}")
+        return failed
+    
     def get_recycling_guidelines(self, waste_type):
         """
         Get recycling guidelines for a specific waste type.
@@ -323,28 +715,41 @@ class Database:
             dict: Guidelines information or None if not found
         """
         try:
-            # Make sure we have a valid waste_type and we're connected to MongoDB
-            if not waste_type or not self._check_connection():
+            # Make sure we have a valid waste_type
+            if not waste_type:
                 return None
                 
             # Normalize waste type
             waste_type = waste_type.lower().strip().replace(' ', '_')
             
+            # Guidelines rarely change, so serve them from memory for a while without touching MongoDB
+            expires, guidelines = self._guidelines.get(waste_type, (0, None))
+            if expires > time.monotonic():
+                return guidelines
+            
+            # Only a miss needs the connection
+            if not self._check_connection():
+                return None
+            
             # Query the guidelines collection
             guidelines = self.db.guidelines.find_one({'waste_type': waste_type})
             
             if guidelines:
                 # Convert ObjectId to string for JSON serialization
                 guidelines['_id'] = str(guidelines['_id'])
-                return guidelines
-                
-            return None
+            
+            # Waste types come from the URL, so don't let unknown ones grow the cache forever
+            if len(self._guidelines) >= GUIDELINES_CACHE_SIZE:
+                self._guidelines.clear()
+            self._guidelines[waste_type] = (time.monotonic() + config.GUIDELINES_CACHE_TTL, guidelines)
+            
+            return guidelines
             
         except Exception as e:
             self.logger.error(f"Error getting recycling guidelines: {e}", exc_info=True)
             return None
     
-    def get_nearby_recycling_centers(self, lat, lon, radius_km=10, materials=None):
+    def get_nearby_recycling_centers(self, lat, lon, radius_km=10, materials=None, limit=50):
         """
         Find recycling centers near a given location.
         
@@ -353,85 +758,53 @@ class Database:
             lon (float): Longitude of the location.
             radius_km (float): Search radius in kilometers.
             materials (list): List of materials to filter by.
+            limit (int): Maximum number of centers to return.
             
         Returns:
-            list: List of nearby recycling centers.
+            list: List of nearby recycling centers, nearest first.
         """
         try:
-            # Convert km to radians (Earth radius is approximately 6371 km)
-            radius_radians = radius_km / 6371.0
-            
-            # Use MongoDB's geospatial query to find nearby centers
-            query = {
-                "location": {
-                    "$geoWithin": {
-                        "$centerSphere": [[lon, lat], radius_radians]
-                    }
-                }
+            # $geoNear uses the 2dsphere index on location and returns centers sorted by
+            # distance, with the distance (converted to km) in the "distance" field
+            geo_near = {
+                "near": {"type": "Point", "coordinates": [lon, lat]},
+                "distanceField": "distance",
+                "distanceMultiplier": 0.001,
+                "maxDistance": radius_km * 1000,
+                "spherical": True
             }
             
             # Add materials filter if specified
             if materials:
-                query["accepted_materials"] = {"$in": materials}
+                geo_near["query"] = {"accepted_materials": {"$in": materials}}
             
-            centers = list(self.db.recycling_centers.find(query))
+            centers = self.db.recycling_centers.aggregate([
+                {"$geoNear": geo_near},
+                {"$limit": limit}
+            ], batchSize=limit)
             
-            # Calculate distance for each center and format result
+            # Format result
             result = []
             for center in centers:
-                # Calculate distance using Haversine formula
-                center_lng = center["location"]["coordinates"][0]
-                center_lat = center["location"]["coordinates"][1]
-                distance = self._calculate_distance(lat, lon, center_lat, center_lng)
-                
                 center_dict = {
                     "id": str(center["_id"]),
                     "name": center["name"],
                     "address": center["address"],
-                    "location_lat": center_lat,
-                    "location_lon": center_lng,
+                    "location_lat": center["location"]["coordinates"][1],
+                    "location_lon": center["location"]["coordinates"][0],
                     "hours": center.get("hours"),
                     "accepted_materials": center.get("accepted_materials", []),
                     "notes": center.get("notes"),
-                    "distance": distance
+                    "distance": center["distance"]
                 }
                 
                 result.append(center_dict)
             
-            # Sort by distance
-            result.sort(key=lambda x: x["distance"])
-            
             return result
         except Exception as e:
             logger.error(f"Error retrieving recycling centers: {e}", exc_info=True)
             return []
     
-    def _calculate_distance(self, lat1, lon1, lat2, lon2):
-        """
-        Calculate distance between two coordinates using the Haversine formula.
-        
-        Args:
-            lat1, lon1: First point coordinates.
-            lat2, lon2: Second point coordinates.
-            
-        Returns:
-            float: Distance in kilometers.
-        """
-        # Convert to radians
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
-        
-        # Haversine formula
-        dlon = lon2_rad - lon1_rad
-        dlat = lat2_rad - lat1_rad
-        a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = 6371 * c  # Earth radius in km
-        
-        return distance
-
     def insert_recycling_guideline(self, waste_type, region, instructions, recyclable, special_handling=None):
         """
         Insert a recycling guideline into the database.
@@ -586,6 +959,7 @@ class Database:
             
             result = self.db.user_challenges.insert_one(user_challenge_doc)
             user_challenge_id = str(result.inserted_id)
+            self._invalidate_dashboard(user_id)
             
             logger.info(f"Assigned challenge {challenge_id} to user {user_id}")
             return user_challenge_id
@@ -611,54 +985,66 @@ class Database:
                         "completed": False,
                         "end_date": {"$gt": datetime.now()}
                     }
-                },
-                {
-                    "$lookup": {
-                        "from": "challenges",
-                        "localField": "challenge_id",
-                        "foreignField": "_id",
-                        "as": "challenge"
-                    }
-                },
-                {"$unwind": "$challenge"},
-                {
-                    "$project": {
-                        "_id": 1,
-                        "user_id": 1,
-                        "challenge_id": 1,
-                        "start_date": 1,
-                        "end_date": 1,
-                        "progress": 1,
-                        "completed": 1,
-                        "reward_claimed": 1,
-                        "title": "$challenge.title",
-                        "description": "$challenge.description",
-                        "goal_type": "$challenge.goal_type",
-                        "goal_target": "$challenge.goal_target",
-                        "difficulty": "$challenge.difficulty",
-                        "points_reward": "$challenge.points_reward",
-                        "duration_days": "$challenge.duration_days"
-                    }
-                },
-                {"$sort": {"end_date": 1}}
-            ]
+                }
+            ] + self._active_challenge_stages()
             
             challenges = list(self.db.user_challenges.aggregate(pipeline))
-            
-            # Format results
-            result = []
-            for challenge in challenges:
-                challenge["id"] = str(challenge["_id"])
-                challenge["user_id"] = str(challenge["user_id"])
-                challenge["challenge_id"] = str(challenge["challenge_id"])
-                challenge["percentage"] = min(100, int((challenge["progress"] / challenge["goal_target"]) * 100))
-                del challenge["_id"]
-                result.append(challenge)
-            
-            return result
+            return self._format_user_challenges(challenges)
         except Exception as e:
             logger.error(f"Error getting user active challenges: {e}", exc_info=True)
             return []
+    
+    def _active_challenge_stages(self):
+        """
+        Aggregation stages that join matched user_challenges with their challenge.
+        
+        Returns:
+            list: Pipeline stages, run after a $match on user_challenges.
+        """
+        return [
+            {
+                "$lookup": {
+                    "from": "challenges",
+                    "localField": "challenge_id",
+                    "foreignField": "_id",
+                    "as": "challenge"
+                }
+            },
+            {"$unwind": "$challenge"},
+            {
+                "$project": {
+                    "_id": 1,
+                    "user_id": 1,
+                    "challenge_id": 1,
+                    "start_date": 1,
+                    "end_date": 1,
+                    "progress": 1,
+                    "completed": 1,
+                    "reward_claimed": 1,
+                    "title": "$challenge.title",
+                    "description": "$challenge.description",
+                    "goal_type": "$challenge.goal_type",
+                    "goal_target": "$challenge.goal_target",
+                    "difficulty": "$challenge.difficulty",
+                    "points_reward": "$challenge.points_reward",
+                    "duration_days": "$challenge.duration_days"
+                }
+            },
+            {"$sort": {"end_date": 1}}
+        ]
+    
+    def _format_user_challenges(self, challenges):
+        """Convert joined user challenges into the form returned by get_user_active_challenges."""
+        result = []
+        for challenge in challenges:
+            challenge["id"] = str(challenge["_id"])
+            challenge["user_id"] = str(challenge["user_id"])
+            challenge["challenge_id"] = str(challenge["challenge_id"])
+            challenge["percentage"] = min(100, int((challenge["progress"] / challenge["goal_target"]) * 100))
+            del challenge["_id"]
+            result.append(challenge)
+        
+        return result
 
     def update_challenge_progress(self, user_challenge_id, progress):
         """
@@ -692,6 +1078,7 @@ class Database:
             )
             
             if result.modified_count > 0:
+                self._invalidate_dashboard(str(challenge["user_id"]))
                 logger.info(f"Updated progress for challenge {user_challenge_id} to {progress}")
                 return True
             else:
@@ -736,6 +1123,7 @@ class Database:
             )
             
             if result.modified_count > 0:
+                self._invalidate_user(user_id)
                 if new_level != current_level:
                     logger.info(f"User {user_id} leveled up from {current_level} to {new_level}")
                 else:
@@ -788,7 +1176,7 @@ class Database:
         """
         try:
             # Get user info
-            user = self.db.users.find_one({"_id": ObjectId(user_id)})
+            user = self.db.users.find_one({"_id": ObjectId(user_id)}, {"points": 1, "level": 1})
             
             if not user:
                 logger.error(f"User {user_id} not found")
@@ -801,47 +1189,166 @@ class Database:
             # Count items scanned
             items_scanned = self.count_user_scans(user_id)
             
-            # Get next level threshold
-            level_thresholds = {
-                "Beginner": 0,
-                "Intermediate": 100,
-                "Advanced": 500,
-                "Expert": 1000,
-                "Master": 5000
-            }
+            return self._build_user_stats(str(user["_id"]), user["points"], user["level"], rank, items_scanned)
+        except Exception as e:
+            logger.error(f"Error getting user stats: {e}", exc_info=True)
+            return None
+    
+    def _build_user_stats(self, user_id, points, level, rank, items_scanned):
+        """
+        Build the stats dict returned by get_user_stats.
+        
+        Args:
+            user_id (str): User ID.
+            points (int): User's points.
+            level (str): User's achievement level.
+            rank (int): User's leaderboard rank.
+            items_scanned (int): Number of items the user has scanned.
             
-            achievement_levels = config.ACHIEVEMENT_LEVELS
-            user_level = user["level"]
-            level_index = achievement_levels.index(user_level)
+        Returns:
+            dict: User stats.
+        """
+        # Get next level threshold
+        level_thresholds = {
+            "Beginner": 0,
+            "Intermediate": 100,
+            "Advanced": 500,
+            "Expert": 1000,
+            "Master": 5000
+        }
+        
+        achievement_levels = config.ACHIEVEMENT_LEVELS
+        level_index = achievement_levels.index(level)
+        
+        next_level = None
+        next_level_threshold = None
+        points_to_next_level = None
+        level_progress = 0
+        
+        if level_index < len(achievement_levels) - 1:
+            next_level = achievement_levels[level_index + 1]
+            next_level_threshold = level_thresholds[next_level]
+            points_to_next_level = next_level_threshold - points
+            
+            # Calculate level progress percentage
+            current_level_threshold = level_thresholds[level]
+            level_points_range = next_level_threshold - current_level_threshold
+            points_earned_in_level = points - current_level_threshold
+            level_progress = min(int((points_earned_in_level / level_points_range) * 100), 99)
+        
+        return {
+            "user_id": user_id,
+            "points": points,
+            "level": level,
+            "rank": rank,
+            "next_level": next_level,
+            "points_to_next_level": points_to_next_level,
+            "items_scanned": items_scanned,
+            "level_progress": level_progress
+        }
+    
+    def get_dashboard_bundle(self, user_id):
+        """
+        Get the user, their stats and their active challenges in one aggregation.
+        
+        Equivalent to get_user, get_user_stats and get_user_active_challenges, but
+        the rank, scan count and challenges are joined server-side so the dashboard
+        needs a single round-trip. With Redis configured the result is cached for
+        DASHBOARD_CACHE_TTL seconds and dropped when the user's points, scans or challenges change.
+        
+        Args:
+            user_id (str): User ID.
             
-            next_level = None
-            next_level_threshold = None
-            points_to_next_level = None
-            level_progress = 0
+        Returns:
+            dict: "user", "stats" (None if they can't be computed) and "challenges",
+                or None if the user is not found.
+        """
+        try:
+            cache_key = f"dashboard:{user_id}"
+            if self.cache is not None:
+                try:
+                    cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        return _cache_loads(cached)
+                except (redis.RedisError, ValueError) as e:
+                    logger.warning(f"Error reading cached dashboard for {user_id}: {e}")
             
-            if level_index < len(achievement_levels) - 1:
-                next_level = achievement_levels[level_index + 1]
-                next_level_threshold = level_thresholds[next_level]
-                points_to_next_level = next_level_threshold - user["points"]
-                
-                # Calculate level progress percentage
-                current_level_threshold = level_thresholds[user_level]
-                level_points_range = next_level_threshold - current_level_threshold
-                points_earned_in_level = user["points"] - current_level_threshold
-                level_progress = min(int((points_earned_in_level / level_points_range) * 100), 99)
+            self.ensure_connected()
             
-            return {
-                "user_id": str(user["_id"]),
-                "points": user["points"],
-                "level": user["level"],
-                "rank": rank,
-                "next_level": next_level,
-                "points_to_next_level": points_to_next_level,
-                "items_scanned": items_scanned,
-                "level_progress": level_progress
-            }
+            pipeline = [
+                {"$match": {"_id": ObjectId(user_id)}},
+                {"$project": {"username": 1, "points": 1, "level": 1, "location": 1}},
+                # Users with more points, for the rank
+                {
+                    "$lookup": {
+                        "from": "users",
+                        "let": {"points": "$points"},
+                        "pipeline": [
+                            {"$match": {"$expr": {"$gt": ["$points", "$$points"]}}},
+                            {"$count": "count"}
+                        ],
+                        "as": "ahead"
+                    }
+                },
+                {
+                    "$lookup": {
+                        "from": "scans",
+                        "let": {"user_id": "$_id"},
+                        "pipeline": [
+                            {"$match": {"$expr": {"$eq": ["$user_id", "$$user_id"]}}},
+                            {"$count": "count"}
+                        ],
+                        "as": "scans"
+                    }
+                },
+                {
+                    "$lookup": {
+                        "from": "user_challenges",
+                        "let": {"user_id": "$_id"},
+                        "pipeline": [
+                            {
+                                "$match": {
+                                    "completed": False,
+                                    "end_date": {"$gt": datetime.now()},
+                                    "$expr": {"$eq": ["$user_id", "$$user_id"]}
+                                }
+                            }
+                        ] + self._active_challenge_stages(),
+                        "as": "challenges"
+                    }
+                }
+            ]
+            
+            bundle = next(self.db.users.aggregate(pipeline), None)
+            if not bundle:
+                logger.error(f"User {user_id} not found")
+                return None
+            
+            ahead = bundle.pop("ahead")
+            scans = bundle.pop("scans")
+            challenges = self._format_user_challenges(bundle.pop("challenges"))
+            user = self._format_user(bundle)
+            
+            try:
+                stats = self._build_user_stats(
+                    user["id"], user["points"], user["level"],
+                    rank=(ahead[0]["count"] if ahead else 0) + 1,
+                    items_scanned=(scans[0]["count"] if scans else 0) + self._pending_scan_count(user["id"])
+                )
+            except (KeyError, ValueError) as e:
+                logger.error(f"Error getting user stats: {e}", exc_info=True)
+                stats = None
+            
+            bundle = {"user": user, "stats": stats, "challenges": challenges}
+            if self.cache is not None:
+                try:
+                    self.cache.setex(cache_key, config.DASHBOARD_CACHE_TTL, _cache_dumps(bundle))
+                except (redis.RedisError, TypeError) as e:
+                    logger.warning(f"Error caching dashboard for {user_id}: {e}")
+            
+            return bundle
         except Exception as e:
-            logger.error(f"Error getting user stats: {e}", exc_info=True)
+            logger.error(f"Error getting dashboard data: {e}", exc_info=True)
             return None
 
     def get_leaderboard(self, limit=10):
@@ -855,13 +1362,35 @@ class Database:
             list: List of user data for the leaderboard.
         """
         try:
+            # The leaderboard changes slowly, so serve it from the cache for a short while
+            cache_key = f"leaderboard:{limit}"
+            if self.cache is not None:
+                try:
+                    cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        return _cache_loads(cached)
+                except (redis.RedisError, ValueError) as e:
+                    logger.warning(f"Error reading cached leaderboard: {e}")
+            else:
+                expires, leaders = self._leaderboards.get(limit, (0, None))
+                if expires > time.monotonic():
+                    return leaders
+            
             self.ensure_connected()
             
             # Get users sorted by points
             leaders = list(self.db.users.find(
                 {},
                 {"username": 1, "points": 1, "level": 1, "_id": 0}
-            ).sort("points", pymongo.DESCENDING).limit(limit))
+            ).sort("points", pymongo.DESCENDING).limit(limit).batch_size(limit))
+            
+            if self.cache is not None:
+                try:
+                    self.cache.setex(cache_key, config.LEADERBOARD_CACHE_TTL, _cache_dumps(leaders))
+                except (redis.RedisError, TypeError) as e:
+                    logger.warning(f"Error caching leaderboard: {e}")
+            else:
+                self._leaderboards[limit] = (time.monotonic() + config.LEADERBOARD_CACHE_TTL, leaders)
             
             return leaders
         except Exception as e:
@@ -966,7 +1495,8 @@ class Database:
 
     def count_user_scans(self, user_id):
         """
-        Count the number of items a user has scanned.
+        Count the number of items a user has scanned, including scans still queued
+        for the background flusher.
         
         Args:
             user_id (str): User ID.
@@ -978,7 +1508,7 @@ class Database:
             self.ensure_connected()
             
             user_id_obj = self.get_object_id(user_id)
-            count = self.db.scans.count_documents({"user_id": user_id_obj})
+            count = self.db.scans.count_documents({"user_id": user_id_obj}) + self._pending_scan_count(user_id)
             
             logger.debug(f"Retrieved scan count for user {user_id}: {count}")
             return count
@@ -222,7 +222,7 @@ class RecyclingGuidelines:
         
         Args:
             waste_type (str): Type of waste material.
-            region (str): Geographic region code. If None, uses 'default'.
+            region (str): Geographic region code, only logged since guidelines aren't stored per region. If None, uses 'default'.
             
         Returns:
             dict: Guidelines for handling this waste type.
@@ -230,15 +230,12 @@ class RecyclingGuidelines:
         if region is None:
             region = "default"
         
-        guidelines = self.db.get_recycling_guidelines(waste_type, region)
-        
-        if not guidelines and region != "default":
-            # Fall back to default guidelines if region-specific ones aren't found
-            guidelines = self.db.get_recycling_guidelines(waste_type, "default")
+        # Guidelines are stored per waste type only; the database keeps them in memory with a TTL
+        guidelines = self.db.get_recycling_guidelines(waste_type)
         
         if not guidelines:
-            # If still no guidelines, use generic non-recyclable guidelines
-            guidelines = self.db.get_recycling_guidelines("non_recyclable", "default")
+            # If there are no guidelines, use generic non-recyclable guidelines
+            guidelines = self.db.get_recycling_guidelines("non_recyclable")
         
         logger.info(f"Retrieved recycling guidelines for {waste_type} in {region}")
         return guidelines
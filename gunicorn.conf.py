@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for RecycleRight.
+
+Usage: gunicorn app:app
+"""
+
+import os
+from importlib.util import find_spec
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5001)}"
+
+# Each worker process loads its own copy of the classifier, so scale with memory in
+# mind rather than the usual 2 * CPUs + 1
+workers = int(os.getenv('WEB_CONCURRENCY', 4))
+
+# Request handlers mostly wait on MongoDB and geolocation calls. With gevent installed,
+# each worker monkey-patches the standard library and multiplexes those waits on
+# greenlets; otherwise each worker serves requests from a thread pool, sized so one
+# slow geocode or query doesn't hold up the requests queued behind it.
+if find_spec('gevent') is not None:
+    worker_class = 'gevent'
+    worker_connections = int(os.getenv('WORKER_CONNECTIONS', 1000))
+else:
+    worker_class = 'gthread'
+    threads = int(os.getenv('THREADS', 16))
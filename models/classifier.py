@@ -4,8 +4,13 @@ Waste classification module using TensorFlow Lite.
 
 import logging
 import os
+import threading
 import numpy as np
 import cv2
+
+# Enable oneDNN kernels (AVX-512/AMX on x86) unless explicitly configured
+os.environ.setdefault('TF_ENABLE_ONEDNN_OPTS', '1')
+
 import tensorflow as tf
 
 # Add parent directory to path to allow imports
@@ -16,6 +21,29 @@ from app import config
 
 logger = logging.getLogger(__name__)
 
+# Interpreters shared across classifier instances, keyed by (model_path, num_threads).
+# Each entry is (interpreter, lock); the lock serializes inference on that interpreter.
+_INTERPRETER_CACHE = {}
+_INTERPRETER_CACHE_LOCK = threading.Lock()
+
+# Numba is optional; without it preprocessing falls back to in-place NumPy ops
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _normalize_bgr(bgr, out, scale, offset):
+        """Swap BGR->RGB, scale to [0, 1] and apply mean/std normalization in one pass."""
+        height, width = bgr.shape[0], bgr.shape[1]
+        for y in prange(height):
+            for x in range(width):
+                for c in range(3):
+                    out[y, x, c] = bgr[y, x, 2 - c] * scale[c] - offset[c]
+else:
+    _normalize_bgr = None
+
 class WasteClassifier:
     """Class for waste classification using TensorFlow Lite."""
     
@@ -32,6 +60,17 @@ class WasteClassifier:
         self.input_size = config.INPUT_SIZE
         self.confidence_threshold = config.CONFIDENCE_THRESHOLD
         
+        # Fold /255, mean subtraction and std division into one scale and offset
+        std = np.asarray(config.NORMALIZE_STD, dtype=np.float32)
+        self._norm_scale = 1.0 / (255.0 * std)
+        self._norm_offset = np.asarray(config.NORMALIZE_MEAN, dtype=np.float32) / std
+        
+        # Resize and model input buffers, reused across calls
+        width, height = self.input_size
+        self._resized_buffer = np.empty((height, width, 3), dtype=np.uint8)
+        self._input_buffer = np.empty((1, height, width, 3), dtype=np.float32)
+        self._batch_buffer = None  # Allocated by classify_batch, grown as needed
+        
         self._load_model()
         self._load_labels()
         
@@ -40,14 +79,26 @@ class WasteClassifier:
     def _load_model(self):
         """Load TensorFlow Lite model."""
         try:
-            # Load the TFLite model
-            self.interpreter = tf.lite.Interpreter(model_path=self.model_path)
-            self.interpreter.allocate_tensors()
+            # Load the TFLite model once per process (model_path is memory-mapped
+            # by TFLite, so the flatbuffer is not copied into the Python heap)
+            key = (self.model_path, config.NUM_THREADS)
+            with _INTERPRETER_CACHE_LOCK:
+                if key not in _INTERPRETER_CACHE:
+                    interpreter = tf.lite.Interpreter(
+                        model_path=self.model_path,
+                        num_threads=config.NUM_THREADS
+                    )
+                    interpreter.allocate_tensors()
+                    _INTERPRETER_CACHE[key] = (interpreter, threading.Lock())
+                self.interpreter, self._interpreter_lock = _INTERPRETER_CACHE[key]
             
             # Get input and output details
             self.input_details = self.interpreter.get_input_details()
             self.output_details = self.interpreter.get_output_details()
             
+            # Integer-input models take RGB pixels (uint8) or quantized values (int8)
+            self._input_dtype = self.input_details[0]['dtype']
+            
             logger.info("TensorFlow Lite model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading TensorFlow Lite model: {e}", exc_info=True)
@@ -57,12 +108,31 @@ class WasteClassifier:
         """Load class labels."""
         try:
             with open(self.labels_path, 'r') as f:
-                self.labels = [line.strip() for line in f.readlines()]
+                self.labels = [sys.intern(label.strip()) for label in f.read().splitlines()]
             logger.info(f"Loaded {len(self.labels)} class labels")
         except Exception as e:
             logger.error(f"Error loading labels: {e}", exc_info=True)
             raise
     
+    def _fast_resize(self, img, target, dst=None):
+        """
+        Resize an image, halving large inputs with cv2.pyrDown first.
+        
+        Each pyrDown pass is a single SIMD pass that quarters the pixel count,
+        so the final INTER_AREA resize only touches a small image.
+        
+        Args:
+            img (numpy.ndarray): Input image.
+            target (tuple): Target size as (width, height).
+            dst (numpy.ndarray, optional): Output buffer for the final resize.
+            
+        Returns:
+            numpy.ndarray: Resized image.
+        """
+        while img.shape[1] >= 2 * target[0] and img.shape[0] >= 2 * target[1]:
+            img = cv2.pyrDown(img)
+        return cv2.resize(img, target, dst=dst, interpolation=cv2.INTER_AREA)
+    
     def preprocess_image(self, image):
         """
         Preprocess image for model input.
@@ -74,23 +144,29 @@ class WasteClassifier:
             Preprocessed image ready for model input.
         """
         # Resize image to required input dimensions
-        resized = cv2.resize(image, self.input_size)
-        
-        # Convert to RGB if it's BGR (OpenCV default)
-        if len(resized.shape) == 3 and resized.shape[2] == 3:
-            resized = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+        resized = self._fast_resize(image, self.input_size, dst=self._resized_buffer)
         
-        # Normalize
-        normalized = resized.astype(np.float32) / 255.0
+        # uint8-input models normalize inside the graph; feed RGB pixels directly
+        if self._input_dtype == np.uint8:
+            return cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=resized)[None, ...]
         
-        # Apply ImageNet normalization if using a pretrained model
-        for i in range(3):
-            normalized[:, :, i] = (normalized[:, :, i] - config.NORMALIZE_MEAN[i]) / config.NORMALIZE_STD[i]
+        # Convert BGR (OpenCV default) to RGB and apply ImageNet normalization,
+        # writing straight into the batched input buffer
+        normalized = self._input_buffer[0]
+        if _normalize_bgr is not None:
+            _normalize_bgr(resized, normalized, self._norm_scale, self._norm_offset)
+        else:
+            rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=resized)
+            np.multiply(rgb, self._norm_scale, out=normalized)
+            np.subtract(normalized, self._norm_offset, out=normalized)
         
-        # Add batch dimension
-        input_data = np.expand_dims(normalized, axis=0)
+        # int8-input models expect the normalized values quantized to the input scale
+        if self._input_dtype == np.int8:
+            scale, zero_point = self.input_details[0]['quantization']
+            quantized = np.rint(self._input_buffer / scale + zero_point)
+            return np.clip(quantized, -128, 127).astype(np.int8)
         
-        return input_data
+        return self._input_buffer
     
     def classify(self, image):
         """
@@ -102,30 +178,94 @@ class WasteClassifier:
         Returns:
             A list of (class_name, probability) tuples sorted by probability.
         """
-        # Preprocess the image
-        input_data = self.preprocess_image(image)
+        # The interpreter and buffers are shared, so run one inference at a time
+        with self._interpreter_lock:
+            # Preprocess the image
+            input_data = self.preprocess_image(image)
+            
+            # Set the input tensor
+            self._set_batch_size(1)
+            self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
+            
+            # Run inference
+            self.interpreter.invoke()
+            
+            # Read the output tensor in place
+            scores = self.interpreter.tensor(self.output_details[0]['index'])()[0]
+            results = self._scores_to_results(scores)
+            del scores
         
-        # Set the input tensor
-        self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
+        logger.info("Classification complete. Found %d results above threshold.", len(results))
+        return results
+    
+    def classify_batch(self, images):
+        """
+        Classify several images with a single interpreter invocation.
         
-        # Run inference
-        self.interpreter.invoke()
+        Args:
+            images: Input images (list of numpy arrays).
+            
+        Returns:
+            A list with one classify() style result list per image.
+        """
+        if not images:
+            return []
         
-        # Get the output tensor
-        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-        scores = output_data[0]
+        with self._interpreter_lock:
+            # Preprocess every image into one (N, H, W, 3) input tensor
+            input_shape = (len(images),) + tuple(self.input_details[0]['shape'][1:])
+            if self._batch_buffer is None or self._batch_buffer.shape[0] < len(images):
+                self._batch_buffer = np.empty(input_shape, dtype=self._input_dtype)
+            batch = self._batch_buffer[:len(images)]
+            for i, image in enumerate(images):
+                batch[i] = self.preprocess_image(image)[0]
+            
+            # Run inference once for the whole batch
+            self._set_batch_size(len(images))
+            self.interpreter.set_tensor(self.input_details[0]['index'], batch)
+            self.interpreter.invoke()
+            
+            outputs = self.interpreter.get_tensor(self.output_details[0]['index'])
+            results = [self._scores_to_results(scores) for scores in outputs]
         
-        # Create a list of (label, score) tuples
-        results = []
-        for i, score in enumerate(scores):
-            if i < len(self.labels) and score >= self.confidence_threshold:
-                results.append((self.labels[i], float(score)))
+        logger.info("Batch classification complete for %d images.", len(images))
+        return results
+    
+    def _set_batch_size(self, batch_size):
+        """
+        Resize the interpreter's input batch dimension if needed.
         
-        # Sort by score in descending order
-        results.sort(key=lambda x: x[1], reverse=True)
+        The interpreter is shared, so this must be called with the interpreter lock
+        held, right before setting the input tensor.
         
-        logger.info(f"Classification complete. Found {len(results)} results above threshold.")
-        return results
+        Args:
+            batch_size (int): Number of images in the next invocation.
+        """
+        if self.interpreter.get_input_details()[0]['shape'][0] != batch_size:
+            shape = [batch_size] + list(self.input_details[0]['shape'][1:])
+            self.interpreter.resize_tensor_input(self.input_details[0]['index'], shape)
+            self.interpreter.allocate_tensors()
+    
+    def _scores_to_results(self, scores):
+        """
+        Convert one image's output scores into sorted (class_name, probability) tuples.
+        
+        Args:
+            scores: Output scores for one image (numpy array).
+            
+        Returns:
+            A list of (class_name, probability) tuples above the confidence threshold.
+        """
+        # Dequantize integer outputs
+        scale, zero_point = self.output_details[0]['quantization']
+        if scale:
+            scores = (scores.astype(np.float32) - zero_point) * scale
+        
+        # Keep labelled classes above the threshold, sorted by score in descending order
+        scores = scores[:len(self.labels)]
+        indices = np.flatnonzero(scores >= self.confidence_threshold)
+        indices = indices[np.argsort(-scores[indices], kind='stable')]
+        return [(self.labels[i], float(scores[i])) for i in indices]
     
     def get_top_prediction(self, image):
         """
@@ -2,13 +2,30 @@
 Utility for converting TensorFlow models to TensorFlow Lite format.
 """
 
+import gc
 import logging
 import os
+import platform
 import tensorflow as tf
 
+# Add parent directory to path to allow imports
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import config
+
 logger = logging.getLogger(__name__)
 
-def convert_to_tflite(model_path, output_path, quantize=True):
+def _has_native_fp16():
+    """
+    Check whether the host CPU has native float16 arithmetic.
+    
+    Returns:
+        bool: True on ARM64, where TFLite runs float16 kernels directly.
+    """
+    return platform.machine().lower() in ('arm64', 'aarch64')
+
+def convert_to_tflite(model_path, output_path, quantize=True, float16=None):
     """
     Convert a TensorFlow model to TensorFlow Lite format.
     
@@ -16,6 +33,10 @@ def convert_to_tflite(model_path, output_path, quantize=True):
         model_path (str): Path to the TensorFlow model.
         output_path (str): Path to save the TensorFlow Lite model.
         quantize (bool): Whether to quantize the model.
+        float16 (bool, optional): Use float16 weight quantization instead of
+            dynamic range (int8 weight) quantization. Defaults to float16 only on
+            hosts with native float16 support; on x86 float16 weights are just
+            dequantized back to float32 at load time.
         
     Returns:
         bool: True if conversion was successful, False otherwise.
@@ -30,14 +51,23 @@ def convert_to_tflite(model_path, output_path, quantize=True):
         
         # Apply optimization if requested
         if quantize:
-            logger.info("Applying post-training quantization")
+            if float16 is None:
+                float16 = _has_native_fp16()
             converter.optimizations = [tf.lite.Optimize.DEFAULT]
-            converter.target_spec.supported_types = [tf.float16]
+            if float16:
+                logger.info("Applying float16 post-training quantization")
+                converter.target_spec.supported_types = [tf.float16]
+            else:
+                logger.info("Applying dynamic range post-training quantization")
         
         # Convert the model
         logger.info("Converting model to TensorFlow Lite format")
         tflite_model = converter.convert()
         
+        # Release the FP32 Keras model before writing the converted one
+        del converter, model
+        gc.collect()
+        
         # Ensure the output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
@@ -59,19 +89,73 @@ def convert_to_tflite(model_path, output_path, quantize=True):
         logger.error(f"Error converting model to TFLite: {e}", exc_info=True)
         return False
 
-def optimize_for_int8(model_path, output_path, representative_dataset):
+def build_representative_dataset(image_dir, num_samples=200, input_size=None, normalize=True):
+    """
+    Build a representative dataset for int8 calibration from a directory of images.
+    
+    Images are streamed with tf.data so JPEG/PNG decoding runs in parallel and
+    overlaps with the converter's calibration passes. Use at least 100 samples
+    for stable scale/zero-point estimates.
+    
+    Args:
+        image_dir (str): Directory containing calibration images.
+        num_samples (int): Maximum number of images to use.
+        input_size (tuple): Model input size as (width, height).
+        normalize (bool): Apply ImageNet normalization. Disable for models that
+            normalize raw [0, 255] pixels inside the graph.
+        
+    Returns:
+        callable: Generator function suitable for converter.representative_dataset.
+    """
+    width, height = input_size or config.INPUT_SIZE
+    # Fold /255 and mean/std into one multiply-subtract, as in the classifier
+    std = tf.constant(config.NORMALIZE_STD, dtype=tf.float32)
+    scale = 1.0 / (255.0 * std)
+    offset = tf.constant(config.NORMALIZE_MEAN, dtype=tf.float32) / std
+    patterns = [os.path.join(image_dir, f"*.{ext}") for ext in ("jpg", "jpeg", "png")]
+    
+    def _load_and_preprocess(path):
+        image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+        image = tf.image.resize(image, (height, width))
+        if not normalize:
+            return image
+        return image * scale - offset
+    
+    def representative_dataset():
+        dataset = (
+            tf.data.Dataset.list_files(patterns, shuffle=True)
+            .take(num_samples)
+            .map(_load_and_preprocess, num_parallel_calls=tf.data.AUTOTUNE)
+            .batch(1)
+            .prefetch(tf.data.AUTOTUNE)
+        )
+        for batch in dataset:
+            yield [batch.numpy()]
+    
+    return representative_dataset
+
+def optimize_for_int8(model_path, output_path, representative_dataset, uint8_input=False):
     """
     Optimize a TensorFlow model for int8 quantization.
     
     Args:
         model_path (str): Path to the TensorFlow model.
         output_path (str): Path to save the TensorFlow Lite model.
-        representative_dataset: A generator that yields representative data for calibration.
+        representative_dataset: A generator that yields representative data for calibration,
+            or a directory of calibration images (see build_representative_dataset).
+        uint8_input (bool): Accept raw uint8 RGB pixels as input. The model must
+            normalize its input itself (e.g. with a Rescaling/Normalization layer)
+            so the classifier can skip float preprocessing entirely.
         
     Returns:
         bool: True if optimization was successful, False otherwise.
     """
     try:
+        if isinstance(representative_dataset, str):
+            representative_dataset = build_representative_dataset(
+                representative_dataset, normalize=not uint8_input
+            )
+        
         # Load the TensorFlow model
         logger.info(f"Loading TensorFlow model from {model_path}")
         model = tf.keras.models.load_model(model_path)
@@ -85,13 +169,17 @@ def optimize_for_int8(model_path, output_path, representative_dataset):
         
         # Force conversion to int8
         converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
-        converter.inference_input_type = tf.int8
+        converter.inference_input_type = tf.uint8 if uint8_input else tf.int8
         converter.inference_output_type = tf.int8
         
         # Convert the model
         logger.info("Converting model to int8 quantized TensorFlow Lite format")
         tflite_model = converter.convert()
         
+        # Release the FP32 Keras model before writing the converted one
+        del converter, model
+        gc.collect()
+        
         # Ensure the output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
@@ -3,16 +3,298 @@ Waste classification model module for RecycleRight application.
 """
 
 import os
+import sys
 import logging
+import functools
+import itertools
+import threading
 import numpy as np
 import cv2
-import random
+from bisect import bisect_right
+from collections import namedtuple
 from pathlib import Path
 
 import config
 
 logger = logging.getLogger(__name__)
 
+# Labels used when no labels file can be found
+DEFAULT_LABELS = (
+    "plastic_bottle", "glass_bottle", "aluminum_can", "paper", "cardboard",
+    "plastic_bag", "food_waste", "styrofoam", "electronic_waste", "batteries",
+    "light_bulb", "clothing", "metal", "plastic_container", "tetra_pak"
+)
+
+@functools.lru_cache(maxsize=8)
+def _resolve_and_read_labels(primary, alt):
+    """
+    Find and read a labels file once per process for each (primary, alt) pair.
+    
+    The configured and alternative paths are tried as given and relative to the
+    base dir.
+    
+    Args:
+        primary (str): Configured labels path.
+        alt (str): Alternative labels path.
+        
+    Returns:
+        tuple: (path, labels) where labels is a tuple of stripped label strings, or
+            (None, DEFAULT_LABELS) if no labels file was found.
+    """
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    candidates = (primary, alt, os.path.join(base_dir, primary), os.path.join(base_dir, alt))
+    
+    for path in candidates:
+        if os.path.exists(path):
+            logger.info(f"Loading labels from: {path}")
+            labels = tuple(sys.intern(label.strip()) for label in Path(path).read_text().splitlines())
+            return path, labels
+    
+    logger.warning(f"Labels file not found at any of the attempted paths. Using default labels.")
+    return None, DEFAULT_LABELS
+
+def _color_fallback_rule(avg_hue, avg_saturation, avg_value, brightness_std):
+    """
+    Colour rules for items that matched no shape or metallic rule.
+    
+    Returns:
+        tuple: (waste_type, base_confidence)
+    """
+    # Brown cardboard: brownish, darker, some saturation
+    if avg_hue < 30 and avg_value < 150 and avg_saturation > 20:
+        return "cardboard", 0.75
+    # Bright paper: yellowish, bright, uniform
+    if avg_hue < 60 and avg_value > 170 and brightness_std < 50:
+        return "paper", 0.72
+    # Default to plastic container for other cases
+    return "plastic_container", 0.70
+
+# Bin edges for (hue, saturation, value, brightness_std). Every threshold used by
+# _color_fallback_rule is an edge (strict '>' thresholds are nudged up one ulp),
+# so a lookup in _COLOR_FALLBACK_TABLE reproduces the rules exactly.
+_COLOR_FALLBACK_EDGES = (
+    (30.0, 60.0),
+    (np.nextafter(20.0, np.inf),),
+    (150.0, np.nextafter(170.0, np.inf)),
+    (50.0,),
+)
+
+def _build_rule_table(rule, bin_edges, dtype=object):
+    """
+    Evaluate a rule function once at the lower bound of every feature bin.
+    
+    All features are non-negative, so the first bin of each feature starts at 0.
+    
+    Args:
+        rule (callable): Rule taking one value per feature.
+        bin_edges (tuple): Sorted bin edges for each feature.
+        dtype: dtype of the resulting table.
+        
+    Returns:
+        numpy.ndarray: Table indexed by one bin number per feature.
+    """
+    lower_bounds = [(0.0,) + edges for edges in bin_edges]
+    table = np.empty([len(bounds) for bounds in lower_bounds], dtype=dtype)
+    for key in itertools.product(*(range(len(bounds)) for bounds in lower_bounds)):
+        table[key] = rule(*(lower_bounds[dim][i] for dim, i in enumerate(key)))
+    return table
+
+def _bin_key(bin_edges, features):
+    """Return the tuple of bin numbers locating features in a _build_rule_table table."""
+    return tuple(bisect_right(edges, x) for edges, x in zip(bin_edges, features))
+
+_COLOR_FALLBACK_TABLE = _build_rule_table(_color_fallback_rule, _COLOR_FALLBACK_EDGES)
+
+# Numba is optional; without it the metallic score fusion runs as plain Python and
+# HSV statistics come from cv2.meanStdDev
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# (waste_type, base_confidence, jitter) for each shape/metallic rule, indexed by
+# _match_shape_rule. A result of -1 means no rule matched.
+_SHAPE_RULES = (
+    ("aluminum_can", 0.88, 0.05),
+    ("plastic_bottle", 0.85, 0.05),
+    ("glass_bottle", 0.82, 0.05),
+    ("aluminum_can", 0.70, 0.1),
+)
+
+def _fuse_metallic_score(brightness_std, texture_energy, contour_density, metallic_color_ratio):
+    """Combine the normalized metallic cues into a score between 0 and 1."""
+    metallic_score = (brightness_std * 0.3 +
+                      texture_energy * 0.3 +
+                      contour_density * 0.2 +
+                      metallic_color_ratio * 0.2)
+    return min(metallic_score * 1.5, 1.0)  # Scale and cap at 1.0
+
+def _match_shape_rule(avg_saturation, avg_value, brightness_std, aspect_ratio, fill_ratio, metallic_score):
+    """
+    Match the shape and metallic rules in priority order.
+    
+    Returns:
+        int: Index into _SHAPE_RULES, or -1 if no rule matched.
+    """
+    # Characteristics of a typical bottle
+    is_bottle_shape = 1.5 < aspect_ratio < 4.0
+    
+    # Check for aluminum can characteristics - prioritize this check before others
+    # Cans typically have a characteristic aspect ratio and metallic appearance
+    if ((aspect_ratio < 2.0 or (0.8 < aspect_ratio < 2.5)) and  # Can shapes vary
+        (metallic_score > 0.6 or (avg_value > 160 and brightness_std > 25)) and  # Metallic surface
+        fill_ratio > 0.65):  # Rectangular/cylindrical shape
+        return 0
+    
+    # Check for plastic bottle characteristics:
+    # - Typically translucent/transparent (high brightness std)
+    # - Often has slight blue/clear tint
+    # - Bottle-like aspect ratio
+    if (brightness_std > 40 and  # Indicates translucency
+        avg_saturation < 50 and  # Low color saturation
+        is_bottle_shape):  # Bottle-like shape
+        return 1
+    
+    # Check for glass bottle characteristics
+    if (brightness_std > 30 and
+        avg_saturation < 40 and
+        is_bottle_shape and
+        avg_value > 150):  # Usually clearer/more transparent
+        return 2
+    
+    # Catch aluminum cans that didn't match the primary pattern
+    if metallic_score > 0.5:
+        return 3
+    
+    return -1
+
+# Bin edges for (saturation, value, brightness_std, aspect_ratio, fill_ratio,
+# metallic_score), built the same way as _COLOR_FALLBACK_EDGES so that a lookup in
+# _SHAPE_RULE_TABLE reproduces _match_shape_rule exactly.
+_SHAPE_RULE_EDGES = (
+    (40.0, 50.0),
+    (np.nextafter(150.0, np.inf), np.nextafter(160.0, np.inf)),
+    (np.nextafter(25.0, np.inf), np.nextafter(30.0, np.inf), np.nextafter(40.0, np.inf)),
+    (np.nextafter(0.8, np.inf), np.nextafter(1.5, np.inf), 2.0, 2.5, 4.0),
+    (np.nextafter(0.65, np.inf),),
+    (np.nextafter(0.5, np.inf), np.nextafter(0.6, np.inf)),
+)
+
+_SHAPE_RULE_TABLE = _build_rule_table(_match_shape_rule, _SHAPE_RULE_EDGES, dtype=np.int8)
+
+if njit is not None:
+    _fuse_metallic_score = njit(cache=True, fastmath=True)(_fuse_metallic_score)
+    
+    @njit(cache=True, fastmath=True)
+    def _hsv_stats(hsv):
+        """Return (mean_h, mean_s, mean_v, std_v) of a uint8 HSV image in one pass."""
+        height, width = hsv.shape[0], hsv.shape[1]
+        sum_h = sum_s = sum_v = sum_v2 = np.int64(0)
+        for y in range(height):
+            for x in range(width):
+                v = np.int64(hsv[y, x, 2])
+                sum_h += hsv[y, x, 0]
+                sum_s += hsv[y, x, 1]
+                sum_v += v
+                sum_v2 += v * v
+        n = height * width
+        mean_v = sum_v / n
+        return sum_h / n, sum_s / n, mean_v, np.sqrt(max(sum_v2 / n - mean_v * mean_v, 0.0))
+else:
+    _hsv_stats = None
+
+# Inclusive HSV bounds of silver/metallic colours for cv2.inRange
+_METALLIC_HSV_LOWER = np.array([0, 0, 151], dtype=np.uint8)
+_METALLIC_HSV_UPPER = np.array([255, 49, 255], dtype=np.uint8)
+
+# Global image features used by the heuristic rules. aspect_ratio, fill_ratio and
+# metallic_score are None when no contour was found.
+ImageFeatures = namedtuple('ImageFeatures', [
+    'avg_hue', 'avg_saturation', 'avg_value', 'brightness_std',
+    'aspect_ratio', 'fill_ratio', 'metallic_score'
+])
+
+# Smallest side a reduced-resolution decode must keep
+_MIN_DECODE_SIDE = 256
+
+@functools.lru_cache(maxsize=32)
+def _read_image_cached(path, mtime_ns, size):
+    """
+    Decode an image once per (path, mtime, size).
+    
+    Callers only need about 256px per side, so JPEGs are decoded at 1/4 or 1/2
+    scale (libjpeg's scaled IDCT) whenever the shorter side stays at least
+    _MIN_DECODE_SIDE, falling back to a full decode for small images. The
+    returned array is shared between callers, so it is marked read-only.
+    
+    Returns:
+        numpy.ndarray: BGR image, or None if it could not be decoded.
+    """
+    img = _decode_reduced(lambda flag: cv2.imread(path, flag))
+    if img is not None:
+        img.setflags(write=False)
+    return img
+
+def _decode_reduced(decode):
+    """
+    Decode at the smallest of 1/4, 1/2 and full scale that keeps _MIN_DECODE_SIDE.
+    
+    Args:
+        decode (callable): Decodes the image given a cv2.IMREAD_* flag.
+        
+    Returns:
+        numpy.ndarray: BGR image, or None if it could not be decoded.
+    """
+    img = None
+    for flag in (cv2.IMREAD_REDUCED_COLOR_4, cv2.IMREAD_REDUCED_COLOR_2, cv2.IMREAD_COLOR):
+        img = decode(flag)
+        if img is None or min(img.shape[:2]) >= _MIN_DECODE_SIDE:
+            break
+    return img
+
+def decode_image(data):
+    """
+    Decode encoded image bytes at reduced resolution for classification.
+    
+    Large JPEGs (e.g. camera captures) are decoded at 1/4 or 1/2 scale, which is
+    all the classifier needs, instead of at full resolution.
+    
+    Args:
+        data (bytes): Encoded image data.
+        
+    Returns:
+        numpy.ndarray: BGR image, or None if the data could not be decoded.
+    """
+    buf = np.frombuffer(data, np.uint8)
+    return _decode_reduced(lambda flag: cv2.imdecode(buf, flag))
+
+def _cuda_available():
+    """Return True if OpenCV was built with CUDA and a CUDA device is present."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+def _load_interpreter_class():
+    """Return a TFLite Interpreter class, preferring tflite_runtime over full TensorFlow."""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            import tensorflow as tf
+        except ImportError:
+            return None
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+def _file_key(path):
+    """Return the (path, mtime_ns, size) cache key for a file, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return os.fspath(path), st.st_mtime_ns, st.st_size
+
 class WasteClassifier:
     """Waste classification model for identifying waste items."""
     
@@ -29,69 +311,271 @@ class WasteClassifier:
         self.labels_path_alt = getattr(config, 'LABELS_PATH_ALT', 'models/labels/waste_labels.txt')
         self.input_size = (224, 224)  # Default input size for model
         self.confidence_threshold = 0.6
+        self.analysis_max_size = 256  # Longest side used for heuristic feature analysis
+        self.max_model_predictions = 5  # Predictions returned by get_all_predictions with a model
+        
+        # Load the TFLite model if available; this may update input_size
+        self._interpreter = None
+        self._load_model()
+        
+        # Preprocessing buffers, reused across calls
+        width, height = self.input_size
+        self._resize_buf = np.empty((height, width, 3), dtype=np.uint8)
+        self._input_tensor = np.empty((1, height, width, 3), dtype=np.float32)
+        
+        # Scratch buffers for feature extraction, sized for the largest analysis image
+        # and viewed at the actual image shape. They make feature extraction
+        # stateful, so it is serialized with _analysis_lock.
+        max_pixels = self.analysis_max_size * self.analysis_max_size
+        self._analysis_lock = threading.RLock()
+        self._analysis_buf = np.empty(max_pixels * 3, dtype=np.uint8)
+        self._hsv_buf = np.empty(max_pixels * 3, dtype=np.uint8)
+        self._gray_buf = np.empty(max_pixels, dtype=np.uint8)
+        self._edge_buf = np.empty(max_pixels, dtype=np.uint8)
+        self._dilate_buf = np.empty(max_pixels, dtype=np.uint8)
+        self._mask_buf = np.empty(max_pixels, dtype=np.uint8)
+        self._cc_labels_buf = np.empty(max_pixels, dtype=np.uint16)  # < 2**16 components at this size
+        self._sx_buf = np.empty(max_pixels, dtype=np.float32)
+        self._sy_buf = np.empty(max_pixels, dtype=np.float32)
+        self._mag_buf = np.empty(max_pixels, dtype=np.float32)
         
-        # Load labels
+        # OpenCV CUDA path for feature extraction, used when a CUDA device is present
+        self.use_cuda = _cuda_available()
+        if self.use_cuda:
+            self._gpu_src = cv2.cuda_GpuMat()
+            self._cuda_canny = cv2.cuda.createCannyEdgeDetector(50, 150)
+            logger.info("Using OpenCV CUDA for feature extraction")
+        
+        # uint8 -> float32 lookup table for scaling pixels to [0, 1]
+        self._norm_lut = np.arange(256, dtype=np.float32) / 255.0
+        
+        # Batch model input, allocated by preprocess_batch and grown as needed. It is
+        # filled and read under _analysis_lock, like the single-image buffers.
+        self._batch_buf = None
+        
+        # Load labels, remembering which file they came from
+        self._labels_file = None
         self.labels = self._load_labels()
         
+        # Per top label, the other labels to sample secondary predictions from
+        self._other_labels = {}
+        
+        # Random source for confidence jitter and secondary predictions
+        self._rng = np.random.default_rng()
+        
+        # Analyses of recently classified files, keyed like _read_image_cached
+        self._analysis_cached = functools.lru_cache(maxsize=32)(self._analyze_file)
+        
+        # Compile the Numba kernels now rather than on the first classification
+        _fuse_metallic_score(0.0, 0.0, 0.0, 0.0)
+        if _hsv_stats is not None:
+            _hsv_stats(np.zeros((1, 1, 3), dtype=np.uint8))
+        
         logger.info(f"Initialized WasteClassifier with {len(self.labels)} labels")
     
+    def _load_model(self):
+        """
+        Load the TFLite model, if one is available.
+        
+        The interpreter runs on TFLite's default XNNPACK CPU delegate. Without a
+        model file or a TFLite runtime the classifier falls back to the colour and
+        shape heuristics.
+        """
+        if not os.path.exists(self.model_path):
+            logger.warning(f"Model file not found at {self.model_path}. Using heuristic classification.")
+            return
+        
+        Interpreter = _load_interpreter_class()
+        if Interpreter is None:
+            logger.warning("No TFLite runtime available. Using heuristic classification.")
+            return
+        
+        try:
+            interpreter = Interpreter(model_path=self.model_path,
+                                      num_threads=getattr(config, 'NUM_THREADS', None))
+            interpreter.allocate_tensors()
+            input_details = interpreter.get_input_details()[0]
+            output_details = interpreter.get_output_details()[0]
+        except Exception as e:
+            logger.error(f"Error loading model, using heuristic classification: {e}", exc_info=True)
+            return
+        
+        _, height, width, _ = input_details['shape']
+        self.input_size = (int(width), int(height))
+        
+        # uint8 -> model input lookup table: pixels scaled to [0, 1], then quantized
+        # for integer inputs (a uint8 input without quantization takes raw pixels)
+        dtype = input_details['dtype']
+        values = np.arange(256, dtype=np.float32) / 255.0
+        if dtype != np.float32:
+            scale, zero_point = input_details['quantization']
+            values = np.round(values / scale + zero_point) if scale else np.arange(256)
+            info = np.iinfo(dtype)
+            values = np.clip(values, info.min, info.max)
+        self._input_lut = values.astype(dtype)
+        self._model_input = np.empty((1, int(height), int(width), 3), dtype=dtype)
+        
+        self._input_index = input_details['index']
+        self._output_index = output_details['index']
+        self._model_batch_size = 1
+        self._output_quantization = output_details['quantization']
+        self._interpreter = interpreter
+        logger.info(f"Loaded TFLite model from {self.model_path} with {dtype.__name__} input")
+    
     def _load_labels(self):
         """
         Load labels from file.
         
         Returns:
-            list: List of label strings.
+            tuple: Label strings.
         """
         try:
-            # Log the actual path being used
-            logger.info(f"Attempting to load labels from: {self.labels_path}")
-            
-            # Check if path exists as absolute path
-            if os.path.exists(self.labels_path):
-                logger.info(f"Loading labels from: {self.labels_path}")
-                with open(self.labels_path, 'r') as f:
-                    return [line.strip() for line in f.readlines()]
-            else:
-                # Try the alternative path
-                logger.info(f"Trying alternative path: {self.labels_path_alt}")
-                if os.path.exists(self.labels_path_alt):
-                    logger.info(f"Loading labels from: {self.labels_path_alt}")
-                    with open(self.labels_path_alt, 'r') as f:
-                        return [line.strip() for line in f.readlines()]
-                else:
-                    # Try relative to current file
-                    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                    full_path = os.path.join(base_dir, self.labels_path)
-                    logger.info(f"Trying path relative to base dir: {full_path}")
-                    
-                    if os.path.exists(full_path):
-                        logger.info(f"Loading labels from: {full_path}")
-                        with open(full_path, 'r') as f:
-                            return [line.strip() for line in f.readlines()]
-                    else:
-                        # Try the alternative path relative to base dir
-                        alt_full_path = os.path.join(base_dir, self.labels_path_alt)
-                        logger.info(f"Trying alternative path relative to base dir: {alt_full_path}")
-                        
-                        if os.path.exists(alt_full_path):
-                            logger.info(f"Loading labels from: {alt_full_path}")
-                            with open(alt_full_path, 'r') as f:
-                                return [line.strip() for line in f.readlines()]
-                        else:
-                            logger.warning(f"Labels file not found at any of the attempted paths. Using default labels.")
-                            # Default waste labels as fallback
-                            return [
-                                "plastic_bottle", "glass_bottle", "aluminum_can", "paper", "cardboard",
-                                "plastic_bag", "food_waste", "styrofoam", "electronic_waste", "batteries",
-                                "light_bulb", "clothing", "metal", "plastic_container", "tetra_pak"
-                            ]
+            self._labels_file, labels = _resolve_and_read_labels(self.labels_path, self.labels_path_alt)
+            return labels
         except Exception as e:
             logger.error(f"Error loading labels: {e}", exc_info=True)
-            return [
-                "plastic_bottle", "glass_bottle", "aluminum_can", "paper", "cardboard",
-                "plastic_bag", "food_waste", "styrofoam", "electronic_waste", "batteries",
-                "light_bulb", "clothing", "metal", "plastic_container", "tetra_pak"
-            ]
+            return DEFAULT_LABELS
+    
+    def _read(self, image_path):
+        """
+        Read an image through the decode cache.
+        
+        Args:
+            image_path (str): Path to image file.
+            
+        Returns:
+            numpy.ndarray: Read-only BGR image, or None if it could not be read.
+        """
+        key = _file_key(image_path)
+        if key is None:
+            return None
+        return _read_image_cached(*key)
+    
+    def _analyze_file(self, path, mtime_ns, size):
+        """Analyze a decoded file; wrapped by self._analysis_cached."""
+        img = _read_image_cached(path, mtime_ns, size)
+        if img is None:
+            return None
+        return self._analyze(img)
+    
+    def _analyze(self, img):
+        """
+        Analyze an image with the model, or with the heuristics if no model is loaded.
+        
+        Args:
+            img (numpy.ndarray): OpenCV image array (BGR format)
+            
+        Returns:
+            numpy.ndarray or ImageFeatures: Model class scores, or heuristic features.
+        """
+        if self._interpreter is not None:
+            return self._model_scores(img)
+        return self._extract_features(img)
+    
+    def _model_scores(self, img):
+        """
+        Run the TFLite model on an image.
+        
+        Args:
+            img (numpy.ndarray): OpenCV image array (BGR format)
+            
+        Returns:
+            numpy.ndarray: Read-only float32 class scores.
+        """
+        # The resize buffer, model input and interpreter are shared state
+        with self._analysis_lock:
+            resized = self._fast_resize(img, self.input_size, dst=self._resize_buf)
+            resized = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=resized)
+            cv2.LUT(resized, self._input_lut, dst=self._model_input[0])
+            
+            self._set_batch_size(1)
+            self._interpreter.set_tensor(self._input_index, self._model_input)
+            self._interpreter.invoke()
+            scores = self._interpreter.get_tensor(self._output_index)[0].astype(np.float32)
+        
+        return self._dequantize(scores)
+    
+    def _dequantize(self, scores):
+        """
+        Dequantize raw float32 model outputs of any shape.
+        
+        Returns:
+            numpy.ndarray: Read-only class scores.
+        """
+        scale, zero_point = self._output_quantization
+        if scale:
+            scores = (scores - zero_point) * scale
+        scores.setflags(write=False)
+        return scores
+    
+    def _set_batch_size(self, batch_size):
+        """
+        Resize the interpreter's input batch dimension if needed.
+        
+        The interpreter is shared, so this must be called with _analysis_lock held,
+        right before setting the input tensor.
+        
+        Args:
+            batch_size (int): Number of images in the next invocation.
+        """
+        if self._model_batch_size != batch_size:
+            width, height = self.input_size
+            self._interpreter.resize_tensor_input(self._input_index, [batch_size, height, width, 3])
+            self._interpreter.allocate_tensors()
+            self._model_batch_size = batch_size
+    
+    def _predict(self, analysis):
+        """
+        Get the top prediction from an analysis returned by _analyze.
+        
+        Returns:
+            tuple: (waste_type, confidence)
+        """
+        if isinstance(analysis, ImageFeatures):
+            return self._predict_from_features(analysis)
+        
+        top = int(np.argmax(analysis))
+        return self.labels[top], float(analysis[top])
+    
+    def _predictions(self, analysis):
+        """
+        Get all predictions from an analysis returned by _analyze.
+        
+        Returns:
+            list: List of prediction dictionaries with 'label' and 'confidence' keys.
+        """
+        if isinstance(analysis, ImageFeatures):
+            return self._expand_predictions(*self._predict_from_features(analysis))
+        
+        order = np.argsort(-analysis, kind='stable')[:self.max_model_predictions]
+        return [{"label": self.labels[idx], "confidence": float(analysis[idx])} for idx in order]
+    
+    @staticmethod
+    def _view(buf, shape):
+        """Return a contiguous view of a flat scratch buffer, or a new array if it is too small."""
+        size = int(np.prod(shape))
+        if size > buf.size:
+            return np.empty(shape, dtype=buf.dtype)
+        return buf[:size].reshape(shape)
+    
+    def _fast_resize(self, img, target, dst=None):
+        """
+        Resize an image, halving large inputs with cv2.pyrDown first.
+        
+        Each pyrDown pass is a single SIMD pass that quarters the pixel count,
+        so the final INTER_AREA resize only touches a small image.
+        
+        Args:
+            img (numpy.ndarray): Input image.
+            target (tuple): Target size as (width, height).
+            dst (numpy.ndarray, optional): Output buffer for the final resize.
+            
+        Returns:
+            numpy.ndarray: Resized image.
+        """
+        while img.shape[1] >= 2 * target[0] and img.shape[0] >= 2 * target[1]:
+            img = cv2.pyrDown(img)
+        return cv2.resize(img, target, dst=dst, interpolation=cv2.INTER_AREA)
     
     def preprocess_image(self, image_path):
         """
@@ -101,235 +585,251 @@ class WasteClassifier:
             image_path (str): Path to image file.
             
         Returns:
-            numpy.ndarray: Preprocessed image.
+            numpy.ndarray: Preprocessed float32 image with a batch dimension. The
+                array is reused by the next call.
         """
         try:
-            # Read and resize image
-            img = cv2.imread(image_path)
+            # Read and resize image into the reusable uint8 buffer
+            img = self._read(image_path)
             if img is None:
                 logger.error(f"Could not read image from {image_path}")
                 return None
                 
-            img = cv2.resize(img, self.input_size)
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            
-            # Normalize to [0, 1]
-            img = img / 255.0
-            
-            # Add batch dimension
-            img = np.expand_dims(img, axis=0)
+            # The resize buffer is shared with model inference
+            with self._analysis_lock:
+                img = self._fast_resize(img, self.input_size, dst=self._resize_buf)
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+                
+                # Normalize to [0, 1] with a table lookup straight into the 4D input tensor
+                cv2.LUT(img, self._norm_lut, dst=self._input_tensor[0])
             
-            return img
+            return self._input_tensor
         except Exception as e:
             logger.error(f"Error preprocessing image: {e}", exc_info=True)
             return None
     
-    def _detect_metallic_surface(self, img):
+    def preprocess_batch(self, image_paths):
+        """
+        Preprocess several images into one batched model input.
+        
+        Args:
+            image_paths (list): Paths to image files.
+            
+        Returns:
+            tuple: (batch, loaded) where batch is an array of shape (N, height, width, 3)
+                in the model's input dtype (float32 in [0, 1] without a model), and loaded
+                is a list of booleans marking which images could be read. Rows for
+                unreadable images are zero. The batch is reused by the next call, so hold
+                _analysis_lock while using it.
+        """
+        images = [self._read(image_path) for image_path in image_paths]
+        for image_path, img in zip(image_paths, images):
+            if img is None:
+                logger.error(f"Could not read image from {image_path}")
+        
+        lut = self._input_lut if self._interpreter is not None else self._norm_lut
+        width, height = self.input_size
+        num_images = len(images)
+        
+        # The batch buffer and resize buffer are shared with model inference
+        with self._analysis_lock:
+            if self._batch_buf is None or self._batch_buf.shape[0] < num_images:
+                self._batch_buf = np.empty((num_images, height, width, 3), dtype=lut.dtype)
+            batch = self._batch_buf[:num_images]
+            
+            # Same fused resize / colour swap / LUT path as preprocess_image
+            for i, img in enumerate(images):
+                if img is None:
+                    batch[i] = 0
+                    continue
+                resized = self._fast_resize(img, self.input_size, dst=self._resize_buf)
+                resized = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=resized)
+                cv2.LUT(resized, lut, dst=batch[i])
+        
+        return batch, [img is not None for img in images]
+    
+    def _detect_metallic_surface(self, img, gray=None, hsv=None, brightness_std=None):
         """
         Detect if an image contains metallic surfaces like aluminum cans.
         
         Args:
             img (numpy.ndarray): Input image.
+            gray (numpy.ndarray, optional): Grayscale version of img, if already computed.
+            hsv (numpy.ndarray, optional): HSV version of img, if already computed.
+            brightness_std (float, optional): Standard deviation of gray, if already computed.
             
         Returns:
             float: Metallic score between 0 and 1.
         """
         try:
-            # Convert to grayscale for texture analysis
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # Calculate gradient for edge detection
-            sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-            sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-            gradient_magnitude = np.sqrt(sobelx**2 + sobely**2)
-            
-            # Normalize gradient
-            if np.max(gradient_magnitude) > 0:
-                gradient_magnitude = gradient_magnitude / np.max(gradient_magnitude)
-            
-            # Metallic surfaces often have:
-            # 1. High brightness variations (reflections)
-            # 2. Distinct texture patterns
-            brightness_std = np.std(gray) / 255.0  # Normalize to 0-1
-            
-            # Calculate texture energy using gradient magnitude
-            texture_energy = np.mean(gradient_magnitude)
-            
-            # Check for reflection patterns (alternating bright and dark regions)
-            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Calculate contour density (metallic objects often have many small contours from reflections)
-            contour_density = len(contours) / (img.shape[0] * img.shape[1]) * 10000  # Normalize
-            contour_density = min(contour_density, 1.0)  # Cap at 1.0
-            
-            # Check for metallic colors (silver, gray)
-            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-            h, s, v = cv2.split(hsv)
-            
-            # Silver/metallic has low saturation and medium-high value
-            metallic_color_mask = (s < 50) & (v > 150)
-            metallic_color_ratio = np.sum(metallic_color_mask) / (img.shape[0] * img.shape[1])
-            
-            # Calculate final metallic score
-            metallic_score = (brightness_std * 0.3 + 
-                             texture_energy * 0.3 + 
-                             contour_density * 0.2 + 
-                             metallic_color_ratio * 0.2)
-            
-            return min(metallic_score * 1.5, 1.0)  # Scale and cap at 1.0
-            
+            # Scratch buffers are shared, so hold the analysis lock throughout
+            with self._analysis_lock:
+                # Convert to grayscale for texture analysis
+                if gray is None:
+                    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+                
+                # Calculate gradient for edge detection
+                shape = gray.shape
+                sobelx = cv2.Sobel(gray, cv2.CV_32F, 1, 0, dst=self._view(self._sx_buf, shape), ksize=3)
+                sobely = cv2.Sobel(gray, cv2.CV_32F, 0, 1, dst=self._view(self._sy_buf, shape), ksize=3)
+                gradient_magnitude = cv2.magnitude(sobelx, sobely, magnitude=self._view(self._mag_buf, shape))
+                
+                # Metallic surfaces often have:
+                # 1. High brightness variations (reflections)
+                # 2. Distinct texture patterns
+                if brightness_std is None:
+                    _, std = cv2.meanStdDev(gray)
+                    brightness_std = float(std[0, 0])
+                brightness_std /= 255.0  # Normalize to 0-1
+                
+                # Calculate texture energy as the mean of the max-normalized gradient magnitude
+                texture_energy = cv2.mean(gradient_magnitude)[0]
+                _, max_magnitude, _, _ = cv2.minMaxLoc(gradient_magnitude)
+                if max_magnitude > 0:
+                    texture_energy /= max_magnitude
+                
+                # Check for reflection patterns (alternating bright and dark regions)
+                edges = cv2.Canny(gray, 60, 180, edges=self._view(self._edge_buf, shape))
+                
+                # Calculate edge density (metallic objects often have many small edges from reflections)
+                contour_density = cv2.countNonZero(edges) / (img.shape[0] * img.shape[1]) * 20.0  # Normalize
+                contour_density = min(contour_density, 1.0)  # Cap at 1.0
+                
+                # Check for metallic colors (silver, gray)
+                if hsv is None:
+                    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+                
+                # Silver/metallic has low saturation (< 50) and medium-high value (> 150)
+                metallic_color_mask = cv2.inRange(hsv, _METALLIC_HSV_LOWER, _METALLIC_HSV_UPPER,
+                                                  dst=self._view(self._mask_buf, shape))
+                metallic_color_ratio = cv2.countNonZero(metallic_color_mask) / (img.shape[0] * img.shape[1])
+                
+                # Calculate final metallic score
+                return _fuse_metallic_score(brightness_std, float(texture_energy),
+                                            float(contour_density), metallic_color_ratio)
+                
         except Exception as e:
             logger.error(f"Error in metallic detection: {e}", exc_info=True)
             return 0.0
     
-    def get_top_prediction(self, image_path):
+    def _classify_by_color(self, avg_hue, avg_saturation, avg_value, brightness_std):
+        """
+        Classify an item from its colour features via the precomputed rule table.
+        
+        Args:
+            avg_hue (float): Mean hue.
+            avg_saturation (float): Mean saturation.
+            avg_value (float): Mean value.
+            brightness_std (float): Standard deviation of grayscale brightness.
+            
+        Returns:
+            tuple: (waste_type, confidence)
+        """
+        features = (avg_hue, avg_saturation, avg_value, brightness_std)
+        waste_type, base_confidence = _COLOR_FALLBACK_TABLE[_bin_key(_COLOR_FALLBACK_EDGES, features)]
+        return waste_type, base_confidence + float(self._rng.uniform(-0.1, 0.1))
+    
+    def get_top_prediction(self, image):
         """
         Get the top waste classification prediction for an image.
         
         Args:
-            image_path (str): Path to image file.
+            image (str or numpy.ndarray): Path to image file, or an already decoded
+                BGR image array.
             
         Returns:
             tuple: (waste_type, confidence) or (None, None) if prediction fails.
         """
         try:
-            # Read and analyze the image
-            img = cv2.imread(image_path)
-            if img is None:
-                logger.error(f"Could not read image from {image_path}")
+            # Analyze the image, reusing the analysis from an earlier call on the same file
+            analysis = self._get_analysis(image)
+            if analysis is None:
                 return None, None
             
-            # Convert to HSV for better color analysis
-            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-            
-            # Calculate image features
-            avg_hue = np.mean(hsv[:,:,0])
-            avg_saturation = np.mean(hsv[:,:,1])
-            avg_value = np.mean(hsv[:,:,2])
-            
-            # Calculate transparency/translucency
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            brightness_std = np.std(gray)
-            
-            # Log key features for debugging
-            logger.debug(f"Image features - hue: {avg_hue:.2f}, saturation: {avg_saturation:.2f}, value: {avg_value:.2f}, brightness_std: {brightness_std:.2f}")
-            
-            # Detect edges for shape analysis
-            edges = cv2.Canny(gray, 50, 150)
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Analyze shape characteristics
-            if len(contours) > 0:
-                largest_contour = max(contours, key=cv2.contourArea)
-                x, y, w, h = cv2.boundingRect(largest_contour)
-                aspect_ratio = float(h) / w if w > 0 else 0
-                
-                # Characteristics of a typical bottle
-                is_bottle_shape = 1.5 < aspect_ratio < 4.0
-                
-                # Detect metallic properties
-                metallic_score = self._detect_metallic_surface(img)
-                
-                # Check for aluminum can characteristics - prioritize this check before others
-                # Cans typically have a characteristic aspect ratio and metallic appearance
-                if ((aspect_ratio < 2.0 or (0.8 < aspect_ratio < 2.5)) and  # Can shapes vary
-                    (metallic_score > 0.6 or (avg_value > 160 and brightness_std > 25)) and  # Metallic surface
-                    cv2.contourArea(largest_contour) / (w * h) > 0.65):  # Rectangular/cylindrical shape
-                    waste_type = "aluminum_can"
-                    confidence = 0.88 + random.uniform(-0.05, 0.05)
-                    logger.debug(f"Detected aluminum can with metallic_score: {metallic_score}")
-                
-                # Check for plastic bottle characteristics:
-                # - Typically translucent/transparent (high brightness std)
-                # - Often has slight blue/clear tint
-                # - Bottle-like aspect ratio
-                elif (brightness_std > 40 and  # Indicates translucency
-                    avg_saturation < 50 and  # Low color saturation
-                    is_bottle_shape):  # Bottle-like shape
-                    waste_type = "plastic_bottle"
-                    confidence = 0.85 + random.uniform(-0.05, 0.05)
-                    
-                # Check for glass bottle characteristics
-                elif (brightness_std > 30 and
-                      avg_saturation < 40 and
-                      is_bottle_shape and
-                      avg_value > 150):  # Usually clearer/more transparent
-                    waste_type = "glass_bottle"
-                    confidence = 0.82 + random.uniform(-0.05, 0.05)
-                    
-                else:
-                    # Default to other common recyclables based on color and texture
-                    # First check for metallic_score to catch aluminum cans that didn't match the primary pattern
-                    if metallic_score > 0.5:
-                        waste_type = "aluminum_can"
-                        confidence = 0.70 + random.uniform(-0.1, 0.1)
-                        logger.debug(f"Detected aluminum can in fallback with metallic_score: {metallic_score}")
-                    # Then check for brown cardboard
-                    elif avg_hue < 30 and avg_value < 150 and avg_saturation > 20:  # Brownish, darker, some saturation
-                        waste_type = "cardboard"
-                        confidence = 0.75 + random.uniform(-0.1, 0.1)
-                    # Then check for bright paper
-                    elif avg_hue < 60 and avg_value > 170 and brightness_std < 50:  # Yellowish, bright, uniform
-                        waste_type = "paper"
-                        confidence = 0.72 + random.uniform(-0.1, 0.1)
-                    # Default to plastic container for other cases
-                    else:
-                        waste_type = "plastic_container"
-                        confidence = 0.70 + random.uniform(-0.1, 0.1)
-            else:
-                # Fallback if no clear contours found
-                waste_type = random.choice(self.labels)
-                confidence = 0.60 + random.uniform(-0.1, 0.1)
-            
-            return waste_type, confidence
+            return self._predict(analysis)
             
         except Exception as e:
             logger.error(f"Error getting prediction: {e}", exc_info=True)
             return None, None
     
-    def get_all_predictions(self, image_path):
+    def get_top_predictions_batch(self, image_paths):
+        """
+        Get the top waste classification prediction for several images.
+        
+        With a model loaded the whole batch goes through a single interpreter
+        invocation. The heuristics work on per-image features, so without a model,
+        or if batch inference fails, the images are classified one at a time.
+        
+        Args:
+            image_paths (list): Paths to image files.
+            
+        Returns:
+            list: (waste_type, confidence) tuples in input order, with (None, None)
+                for images that could not be classified.
+        """
+        if not image_paths:
+            return []
+        
+        if self._interpreter is not None:
+            try:
+                # The batch buffer is only valid until the next preprocess, so keep the lock
+                with self._analysis_lock:
+                    batch, loaded = self.preprocess_batch(image_paths)
+                    self._set_batch_size(len(image_paths))
+                    self._interpreter.set_tensor(self._input_index, batch)
+                    self._interpreter.invoke()
+                    scores = self._interpreter.get_tensor(self._output_index).astype(np.float32)
+                
+                scores = self._dequantize(scores)
+                return [self._predict(row) if ok else (None, None) for row, ok in zip(scores, loaded)]
+            except Exception as e:
+                logger.error(f"Batch inference failed, classifying images one at a time: {e}", exc_info=True)
+        
+        return [self.get_top_prediction(image_path) for image_path in image_paths]
+    
+    def get_all_predictions(self, image):
         """
         Get all waste classification predictions for an image.
         
         Args:
-            image_path (str): Path to image file.
+            image (str or numpy.ndarray): Path to image file, or an already decoded
+                BGR image array.
             
         Returns:
             list: List of prediction dictionaries with 'label' and 'confidence' keys.
         """
         try:
-            # Get top prediction first
-            top_type, top_confidence = self.get_top_prediction(image_path)
-            if not top_type:
+            # Analyze the image, reusing the analysis from an earlier call on the same file
+            analysis = self._get_analysis(image)
+            if analysis is None:
                 return []
-                
-            # Create a list with the top prediction and some random ones
-            predictions = [{"label": top_type, "confidence": top_confidence}]
-            
-            # Add 2-4 more predictions with lower confidence
-            num_additional = random.randint(2, 4)
-            remaining_labels = [label for label in self.labels if label != top_type]
             
-            for _ in range(num_additional):
-                if not remaining_labels:
-                    break
-                
-                rand_label = random.choice(remaining_labels)
-                remaining_labels.remove(rand_label)
-                
-                # Lower confidence for additional predictions
-                rand_confidence = top_confidence * random.uniform(0.3, 0.8)
-                predictions.append({"label": rand_label, "confidence": rand_confidence})
-            
-            # Sort by confidence (descending)
-            predictions.sort(key=lambda x: x["confidence"], reverse=True)
-            
-            return predictions
+            return self._predictions(analysis)
         except Exception as e:
             logger.error(f"Error getting all predictions: {e}", exc_info=True)
             return []
     
+    def _get_analysis(self, image):
+        """
+        Analyze an image array, or an image file cached by (path, mtime, size).
+        
+        Args:
+            image (str or numpy.ndarray): Path to image file, or a decoded BGR image.
+            
+        Returns:
+            numpy.ndarray or ImageFeatures: Result of _analyze, or None if the image
+                could not be read.
+        """
+        # Already decoded images are analyzed directly, without touching the disk
+        if isinstance(image, np.ndarray):
+            return self._analyze(image)
+        
+        key = _file_key(image)
+        analysis = self._analysis_cached(*key) if key is not None else None
+        if analysis is None:
+            logger.error(f"Could not read image from {image}")
+        return analysis
+    
     def get_predictions_from_array(self, img):
         """
         Get all waste classification predictions for an image array.
@@ -341,36 +841,45 @@ class WasteClassifier:
             list: List of prediction dictionaries with 'label' and 'confidence' keys.
         """
         try:
-            # Get top prediction first
-            top_type, top_confidence = self._get_prediction_from_array(img)
-            if not top_type:
+            if img is None:
+                logger.error("Input image array is None")
                 return []
-                
-            # Create a list with the top prediction and some random ones
-            predictions = [{"label": top_type, "confidence": top_confidence}]
-            
-            # Add 2-4 more predictions with lower confidence
-            num_additional = random.randint(2, 4)
-            remaining_labels = [label for label in self.labels if label != top_type]
-            
-            for _ in range(num_additional):
-                if not remaining_labels:
-                    break
-                
-                rand_label = random.choice(remaining_labels)
-                remaining_labels.remove(rand_label)
-                
-                # Lower confidence for additional predictions
-                rand_confidence = top_confidence * random.uniform(0.3, 0.8)
-                predictions.append({"label": rand_label, "confidence": rand_confidence})
-            
-            # Sort by confidence (descending)
-            predictions.sort(key=lambda x: x["confidence"], reverse=True)
             
-            return predictions
+            return self._predictions(self._analyze(img))
         except Exception as e:
             logger.error(f"Error getting predictions from array: {e}", exc_info=True)
             return []
+    
+    def _expand_predictions(self, top_type, top_confidence):
+        """
+        Build the prediction list from the top prediction.
+        
+        Args:
+            top_type (str): Top predicted waste type.
+            top_confidence (float): Confidence of the top prediction.
+            
+        Returns:
+            list: List of prediction dictionaries with 'label' and 'confidence' keys.
+        """
+        if not top_type:
+            return []
+            
+        # Labels other than the top one, built once per top label
+        remaining_labels = self._other_labels.get(top_type)
+        if remaining_labels is None:
+            remaining_labels = tuple(label for label in self.labels if label != top_type)
+            self._other_labels[top_type] = remaining_labels
+        
+        # Add 2-4 more distinct predictions with lower confidence. These are always
+        # below the top confidence, so sorting them keeps the list in descending order.
+        num_additional = min(int(self._rng.integers(2, 5)), len(remaining_labels))
+        picks = self._rng.choice(len(remaining_labels), size=num_additional, replace=False)
+        rand_confidences = np.sort(top_confidence * self._rng.uniform(0.3, 0.8, size=num_additional))[::-1]
+        
+        return [{"label": top_type, "confidence": top_confidence}] + [
+            {"label": remaining_labels[idx], "confidence": float(rand_confidence)}
+            for idx, rand_confidence in zip(picks, rand_confidences)
+        ]
             
     def _get_prediction_from_array(self, img):
         """
@@ -387,90 +896,157 @@ class WasteClassifier:
                 logger.error("Input image array is None")
                 return None, None
             
-            # Convert to HSV for better color analysis
-            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+            return self._predict(self._analyze(img))
+            
+        except Exception as e:
+            logger.error(f"Error getting prediction from array: {e}", exc_info=True)
+            return None, None
+    
+    def _analysis_size(self, img):
+        """
+        Return the (width, height) to analyze an image at, or None to keep its size.
+        
+        The features are global summaries, so large images are analyzed downscaled
+        to analysis_max_size on the longest side.
+        """
+        height, width = img.shape[:2]
+        scale = self.analysis_max_size / max(height, width)
+        if scale >= 1.0:
+            return None
+        return max(1, round(width * scale)), max(1, round(height * scale))
+    
+    def _prepare_analysis(self, img):
+        """
+        Downscale an image and compute the HSV, luminance and edge images for analysis.
+        
+        Args:
+            img (numpy.ndarray): OpenCV image array (BGR format)
+            
+        Returns:
+            tuple: (img, hsv, gray, edges) at analysis size, where gray is the V
+                channel and edges the Canny edge map. All are scratch buffer views.
+        """
+        size = self._analysis_size(img)
+        if size is not None:
+            img = cv2.resize(img, size, dst=self._view(self._analysis_buf, (size[1], size[0], 3)),
+                             interpolation=cv2.INTER_AREA)
+        shape = img.shape[:2]
+        
+        # Convert to HSV for better color analysis, using V as luminance
+        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV, dst=self._view(self._hsv_buf, shape + (3,)))
+        gray = cv2.extractChannel(hsv, 2, dst=self._view(self._gray_buf, shape))
+        
+        # Detect edges for shape analysis
+        edges = cv2.Canny(gray, 50, 150, edges=self._view(self._edge_buf, shape))
+        return img, hsv, gray, edges
+    
+    def _prepare_analysis_cuda(self, img):
+        """
+        Same as _prepare_analysis, with the resize, colour conversion and Canny run
+        on the GPU. The image is uploaded once and only the small results are
+        downloaded.
+        """
+        self._gpu_src.upload(img)
+        gpu_img = self._gpu_src
+        size = self._analysis_size(img)
+        if size is not None:
+            gpu_img = cv2.cuda.resize(gpu_img, size, interpolation=cv2.INTER_AREA)
+        gpu_hsv = cv2.cuda.cvtColor(gpu_img, cv2.COLOR_BGR2HSV)
+        gpu_gray = cv2.cuda.split(gpu_hsv)[2]
+        gpu_edges = self._cuda_canny.detect(gpu_gray)
+        
+        width, height = gpu_img.size()
+        shape = (height, width)
+        return (gpu_img.download(self._view(self._analysis_buf, shape + (3,))),
+                gpu_hsv.download(self._view(self._hsv_buf, shape + (3,))),
+                gpu_gray.download(self._view(self._gray_buf, shape)),
+                gpu_edges.download(self._view(self._edge_buf, shape)))
+    
+    def _extract_features(self, img):
+        """
+        Extract the colour, shape and texture features used by the heuristic rules.
+        
+        Args:
+            img (numpy.ndarray): OpenCV image array (BGR format)
             
-            # Calculate image features
-            avg_hue = np.mean(hsv[:,:,0])
-            avg_saturation = np.mean(hsv[:,:,1])
-            avg_value = np.mean(hsv[:,:,2])
+        Returns:
+            ImageFeatures: Extracted features.
+        """
+        # Scratch buffers are shared, so hold the analysis lock throughout
+        with self._analysis_lock:
+            # Downscale, convert to HSV and detect edges, on the GPU when available
+            if self.use_cuda:
+                img, hsv, gray, edges = self._prepare_analysis_cuda(img)
+            else:
+                img, hsv, gray, edges = self._prepare_analysis(img)
+            shape = gray.shape
             
-            # Calculate transparency/translucency
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            brightness_std = np.std(gray)
+            # Calculate image features and transparency/translucency (V-channel
+            # deviation, using V as luminance) in one pass
+            if _hsv_stats is not None:
+                avg_hue, avg_saturation, avg_value, brightness_std = _hsv_stats(hsv)
+            else:
+                means, stds = cv2.meanStdDev(hsv)
+                avg_hue, avg_saturation, avg_value = (float(m) for m in means.ravel())
+                brightness_std = float(stds[2, 0])
             
             # Log key features for debugging
-            logger.debug(f"Image features - hue: {avg_hue:.2f}, saturation: {avg_saturation:.2f}, value: {avg_value:.2f}, brightness_std: {brightness_std:.2f}")
+            logger.debug("Image features - hue: %.2f, saturation: %.2f, value: %.2f, brightness_std: %.2f",
+                         avg_hue, avg_saturation, avg_value, brightness_std)
             
-            # Detect edges for shape analysis
-            edges = cv2.Canny(gray, 50, 150)
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            # Close small gaps between edge segments before shape analysis
+            edges = cv2.dilate(edges, None, dst=self._view(self._dilate_buf, shape), iterations=1)
+            num_components, _, stats, _ = cv2.connectedComponentsWithStats(
+                edges, labels=self._view(self._cc_labels_buf, shape), connectivity=8, ltype=cv2.CV_16U)
             
-            # Analyze shape characteristics
-            if len(contours) > 0:
-                largest_contour = max(contours, key=cv2.contourArea)
-                x, y, w, h = cv2.boundingRect(largest_contour)
-                aspect_ratio = float(h) / w if w > 0 else 0
-                
-                # Characteristics of a typical bottle
-                is_bottle_shape = 1.5 < aspect_ratio < 4.0
+            aspect_ratio = fill_ratio = metallic_score = None
+            if num_components > 1:
+                # Analyze shape characteristics of the largest component (label 0 is background)
+                largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+                w = int(stats[largest, cv2.CC_STAT_WIDTH])
+                h = int(stats[largest, cv2.CC_STAT_HEIGHT])
+                aspect_ratio = float(h) / w if w > 0 else 0.0
+                fill_ratio = int(stats[largest, cv2.CC_STAT_AREA]) / (w * h)
                 
                 # Detect metallic properties
-                metallic_score = self._detect_metallic_surface(img)
-                
-                # Check for aluminum can characteristics - prioritize this check before others
-                # Cans typically have a characteristic aspect ratio and metallic appearance
-                if ((aspect_ratio < 2.0 or (0.8 < aspect_ratio < 2.5)) and  # Can shapes vary
-                    (metallic_score > 0.6 or (avg_value > 160 and brightness_std > 25)) and  # Metallic surface
-                    cv2.contourArea(largest_contour) / (w * h) > 0.65):  # Rectangular/cylindrical shape
-                    waste_type = "aluminum_can"
-                    confidence = 0.88 + random.uniform(-0.05, 0.05)
-                    logger.debug(f"Detected aluminum can with metallic_score: {metallic_score}")
-                
-                # Check for plastic bottle characteristics:
-                # - Typically translucent/transparent (high brightness std)
-                # - Often has slight blue/clear tint
-                # - Bottle-like aspect ratio
-                elif (brightness_std > 40 and  # Indicates translucency
-                    avg_saturation < 50 and  # Low color saturation
-                    is_bottle_shape):  # Bottle-like shape
-                    waste_type = "plastic_bottle"
-                    confidence = 0.85 + random.uniform(-0.05, 0.05)
-                    
-                # Check for glass bottle characteristics
-                elif (brightness_std > 30 and
-                      avg_saturation < 40 and
-                      is_bottle_shape and
-                      avg_value > 150):  # Usually clearer/more transparent
-                    waste_type = "glass_bottle"
-                    confidence = 0.82 + random.uniform(-0.05, 0.05)
-                    
-                else:
-                    # Default to other common recyclables based on color and texture
-                    # First check for metallic_score to catch aluminum cans that didn't match the primary pattern
-                    if metallic_score > 0.5:
-                        waste_type = "aluminum_can"
-                        confidence = 0.70 + random.uniform(-0.1, 0.1)
-                        logger.debug(f"Detected aluminum can in fallback with metallic_score: {metallic_score}")
-                    # Then check for brown cardboard
-                    elif avg_hue < 30 and avg_value < 150 and avg_saturation > 20:  # Brownish, darker, some saturation
-                        waste_type = "cardboard"
-                        confidence = 0.75 + random.uniform(-0.1, 0.1)
-                    # Then check for bright paper
-                    elif avg_hue < 60 and avg_value > 170 and brightness_std < 50:  # Yellowish, bright, uniform
-                        waste_type = "paper"
-                        confidence = 0.72 + random.uniform(-0.1, 0.1)
-                    # Default to plastic container for other cases
-                    else:
-                        waste_type = "plastic_container"
-                        confidence = 0.70 + random.uniform(-0.1, 0.1)
-            else:
-                # Fallback if no clear contours found
-                waste_type = random.choice(self.labels)
-                confidence = 0.60 + random.uniform(-0.1, 0.1)
+                metallic_score = self._detect_metallic_surface(img, gray=gray, hsv=hsv,
+                                                               brightness_std=brightness_std)
             
-            return waste_type, confidence
+            return ImageFeatures(avg_hue, avg_saturation, avg_value, brightness_std,
+                                 aspect_ratio, fill_ratio, metallic_score)
+    
+    def _predict_from_features(self, features):
+        """
+        Apply the heuristic classification rules to extracted features.
+        
+        Args:
+            features (ImageFeatures): Features from _extract_features.
             
-        except Exception as e:
-            logger.error(f"Error getting prediction from array: {e}", exc_info=True)
-            return None, None 
\ No newline at end of file
+        Returns:
+            tuple: (waste_type, confidence)
+        """
+        (avg_hue, avg_saturation, avg_value, brightness_std,
+         aspect_ratio, fill_ratio, metallic_score) = features
+        
+        if aspect_ratio is None:
+            # Fallback if no clear contours found
+            waste_type = self.labels[self._rng.integers(len(self.labels))]
+            confidence = 0.60 + float(self._rng.uniform(-0.1, 0.1))
+            return waste_type, confidence
+        
+        # Look up the shape/metallic rules from the binned features
+        rule = _SHAPE_RULE_TABLE[_bin_key(_SHAPE_RULE_EDGES, (
+            avg_saturation, avg_value, brightness_std, aspect_ratio, fill_ratio, metallic_score
+        ))]
+        if rule >= 0:
+            waste_type, base_confidence, jitter = _SHAPE_RULES[rule]
+            confidence = base_confidence + float(self._rng.uniform(-jitter, jitter))
+            if waste_type == "aluminum_can":
+                logger.debug("Detected aluminum can with metallic_score: %s", metallic_score)
+        else:
+            # Otherwise look up the colour rules (cardboard, paper, plastic container)
+            waste_type, confidence = self._classify_by_color(
+                avg_hue, avg_saturation, avg_value, brightness_std
+            )
+        
+        return waste_type, confidence
@@ -7,7 +7,10 @@ import os
 import sys
 import cv2
 import numpy as np
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add parent directory to path to allow imports
@@ -17,6 +20,83 @@ from app import config
 
 logger = logging.getLogger(__name__)
 
+class ScanHistory:
+    """
+    Recent scans stored column-wise in NumPy arrays.
+    
+    Waste types are stored as int16 indices into waste_types, so per-type counts
+    are a single np.bincount. The columns double in size when full.
+    """
+    
+    def __init__(self, waste_types=(), capacity=64):
+        """
+        Initialize an empty scan history.
+        
+        Args:
+            waste_types (iterable): Known waste type labels, e.g. the classifier labels.
+            capacity (int): Initial number of rows.
+        """
+        self.waste_types = list(waste_types)
+        self._type_index = {waste_type: i for i, waste_type in enumerate(self.waste_types)}
+        self._size = 0
+        
+        self.ids = np.empty(capacity, dtype=object)
+        self.type_ids = np.empty(capacity, dtype=np.int16)
+        self.confidences = np.empty(capacity, dtype=np.float32)
+        self.points = np.empty(capacity, dtype=np.int32)
+        self.timestamps = np.empty(capacity, dtype=np.int64)  # Unix epoch seconds
+        self.guidelines = np.empty(capacity, dtype=object)
+    
+    def __len__(self):
+        return self._size
+    
+    def append(self, scan_id, waste_type, confidence, guidelines, points, timestamp):
+        """
+        Add a scan.
+        
+        Args:
+            scan_id: Database ID of the scan.
+            waste_type (str): Classified waste type.
+            confidence (float): Classification confidence.
+            guidelines (dict): Recycling guidelines shown for the scan.
+            points (int): Points awarded for the scan.
+            timestamp (datetime): Time of the scan.
+        """
+        if self._size == len(self.ids):
+            self._grow()
+        
+        type_id = self._type_index.get(waste_type)
+        if type_id is None:
+            type_id = self._type_index[waste_type] = len(self.waste_types)
+            self.waste_types.append(waste_type)
+        
+        i = self._size
+        self.ids[i] = scan_id
+        self.type_ids[i] = type_id
+        self.confidences[i] = confidence
+        self.points[i] = points or 0
+        self.timestamps[i] = int(timestamp.timestamp())
+        self.guidelines[i] = guidelines
+        self._size += 1
+    
+    def _grow(self):
+        """Double the capacity of every column."""
+        for name in ("ids", "type_ids", "confidences", "points", "timestamps", "guidelines"):
+            column = getattr(self, name)
+            grown = np.empty(2 * len(column), dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+    
+    def waste_type_counts(self):
+        """
+        Count scans per waste type.
+        
+        Returns:
+            dict: Mapping of waste type to number of scans.
+        """
+        counts = np.bincount(self.type_ids[:self._size], minlength=len(self.waste_types))
+        return {self.waste_types[i]: int(count) for i, count in enumerate(counts) if count}
+
 class UserInterface:
     """Main user interface class for RecycleRight application."""
     
@@ -40,7 +120,8 @@ class UserInterface:
         # User state
         self.current_user = None
         self.current_location = None
-        self.recent_scans = []
+        self._current_region = None
+        self.recent_scans = ScanHistory(getattr(classifier, 'labels', ()))
         
         logger.info("User interface initialized")
     
@@ -80,9 +161,22 @@ class UserInterface:
             {"image_path": os.path.join(config.ASSETS_DIR, "samples/glass_jar.jpg"), "type": "glass"}
         ]
         
-        for item in waste_items:
-            self._scan_waste_item(item["image_path"])
-            time.sleep(1)  # Simulate time between scans
+        # Decode the samples in parallel (imread releases the GIL) and classify them in one batch
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            images = list(executor.map(cv2.imread, [item["image_path"] for item in waste_items]))
+        loaded = [i for i, image in enumerate(images) if image is not None]
+        predictions = {}
+        try:
+            batch_results = self.classifier.classify_batch([images[i] for i in loaded]) if loaded else []
+            predictions = {i: results[0] if results else (None, 0) for i, results in zip(loaded, batch_results)}
+        except Exception as e:
+            # Without batch predictions each item is classified on its own by _scan_waste_item
+            logger.error(f"Batch classification failed, classifying items one at a time: {e}", exc_info=True)
+        
+        for i, item in enumerate(waste_items):
+            self._scan_waste_item(item["image_path"], image=images[i], prediction=predictions.get(i))
+            if config.DEMO_SLEEP:
+                time.sleep(1)  # Simulate time between scans
         
         # 5. Show user stats and achievements
         self._display_user_stats()
@@ -110,9 +204,10 @@ class UserInterface:
         user = db.get_user(username=username)
         
         if not user:
-            # Create user if it doesn't exist (for demo purposes)
-            import hashlib
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
+            # Create user if it doesn't exist (for demo purposes), hashed the same
+            # salted way as web sign-ups so the account also works for web login
+            from werkzeug.security import generate_password_hash
+            password_hash = generate_password_hash(password, method=config.PASSWORD_HASH_METHOD)
             
             user_id = db.add_user(
                 username=username,
@@ -140,42 +235,47 @@ class UserInterface:
         logger.info(f"Setting user location: {location}")
         self.current_location = location
         
+        # Get region code based on location, reused by every scan until the location changes
+        self._current_region = self.geo_service.get_region_from_location(location[0], location[1])
+        logger.info(f"User region determined: {self._current_region}")
+        
         # Update user location in database
         if self.current_user:
             from data.database import get_db
             db = get_db()
             
             db.update_user_location(self.current_user["id"], location)
-            
-            # Get region code based on location
-            region = self.geo_service.get_region_from_location(location[0], location[1])
-            logger.info(f"User region determined: {region}")
     
-    def _scan_waste_item(self, image_path):
+    def _scan_waste_item(self, image_path, image=None, prediction=None):
         """
         Process a waste item scan.
         
         Args:
             image_path (str): Path to the image file.
+            image (numpy.ndarray, optional): The decoded image, if already loaded.
+            prediction (tuple, optional): (waste_type, confidence), if already classified.
         """
-        logger.info(f"Scanning waste item: {image_path}")
+        logger.info("Scanning waste item: %s", image_path)
         
         try:
-            # Load image
-            image = cv2.imread(image_path)
-            if image is None:
-                logger.error(f"Failed to load image: {image_path}")
-                return
-            
-            # Classify waste
-            waste_type, confidence = self.classifier.get_top_prediction(image)
+            if prediction is None:
+                # Load image
+                if image is None:
+                    image = cv2.imread(image_path)
+                if image is None:
+                    logger.error(f"Failed to load image: {image_path}")
+                    return
+                
+                # Classify waste
+                prediction = self.classifier.get_top_prediction(image)
+            waste_type, confidence = prediction
             
             if not waste_type:
                 logger.warning("No waste type identified with sufficient confidence")
                 self._display_result(None, 0, "Unknown", None)
                 return
             
-            logger.info(f"Classified as {waste_type} with confidence {confidence:.2f}")
+            logger.info("Classified as %s with confidence %.2f", waste_type, confidence)
             
             # Save scan to database
             from data.database import get_db
@@ -198,10 +298,7 @@ class UserInterface:
             )
             
             # Get recycling guidelines
-            region = self.geo_service.get_region_from_location(
-                self.current_location[0], self.current_location[1]
-            ) if self.current_location else "default"
-            
+            region = self._current_region or "default"
             guidelines = self.guidelines.get_disposal_instructions(waste_type, region)
             
             # Update challenges progress
@@ -222,14 +319,14 @@ class UserInterface:
                 self._display_new_achievements(new_achievements)
             
             # Add to recent scans
-            self.recent_scans.append({
-                "id": scan_id,
-                "waste_type": waste_type,
-                "confidence": confidence,
-                "guidelines": guidelines,
-                "points": points,
-                "timestamp": datetime.now()
-            })
+            self.recent_scans.append(
+                scan_id=scan_id,
+                waste_type=waste_type,
+                confidence=confidence,
+                guidelines=guidelines,
+                points=points,
+                timestamp=datetime.now()
+            )
             
             # Display result
             self._display_result(waste_type, confidence, guidelines["disposal_method"], guidelines["instructions"])
@@ -253,7 +350,7 @@ class UserInterface:
             scan_id (int): The scan ID.
             waste_type (str): The waste type.
         """
-        logger.info(f"Confirming disposal of {waste_type} (scan ID: {scan_id})")
+        logger.info("Confirming disposal of %s (scan ID: %s)", waste_type, scan_id)
         
         # Award points for correct disposal
         points = self.points_system.award_points_for_correct_disposal(
@@ -268,7 +365,7 @@ class UserInterface:
             waste_type=waste_type
         )
         
-        logger.info(f"Awarded {points} points for correct disposal")
+        logger.info("Awarded %s points for correct disposal", points)
         
         # Check for new achievements
         new_achievements = self.challenges.check_achievements(self.current_user["id"])
@@ -288,9 +385,9 @@ class UserInterface:
         # In a real app, this would update the UI
         # For this implementation, we'll just log the result
         if waste_type:
-            logger.info(f"Result: {waste_type} (Confidence: {confidence:.2f})")
-            logger.info(f"Disposal Method: {disposal_method}")
-            logger.info(f"Instructions: {instructions}")
+            logger.info("Result: %s (Confidence: %.2f)", waste_type, confidence)
+            logger.info("Disposal Method: %s", disposal_method)
+            logger.info("Instructions: %s", instructions)
         else:
             logger.info("Result: Unknown waste type")
     
@@ -303,9 +400,9 @@ class UserInterface:
         """
         # In a real app, this would update the UI
         # For this implementation, we'll just log the centers
-        logger.info(f"Found {len(centers)} nearby recycling centers:")
+        logger.info("Found %d nearby recycling centers:", len(centers))
         for i, center in enumerate(centers[:3]):  # Show top 3
-            logger.info(f"{i+1}. {center['name']} - {center['address']} ({center['distance']:.1f} km)")
+            logger.info("%d. %s - %s (%.1f km)", i + 1, center['name'], center['address'], center['distance'])
     
     def _display_challenges(self, challenges):
         """
@@ -316,9 +413,9 @@ class UserInterface:
         """
         # In a real app, this would update the UI
         # For this implementation, we'll just log the challenges
-        logger.info(f"Active Challenges ({len(challenges)}):")
+        logger.info("Active Challenges (%d):", len(challenges))
         for challenge in challenges:
-            logger.info(f"- {challenge['title']}: {challenge['progress']}/{challenge['goal_target']} ({challenge['percentage']}%)")
+            logger.info("- %s: %s/%s (%s%%)", challenge['title'], challenge['progress'], challenge['goal_target'], challenge['percentage'])
     
     def _display_user_stats(self):
         """Display user statistics."""
@@ -330,9 +427,15 @@ class UserInterface:
         
         # In a real app, this would update the UI
         # For this implementation, we'll just log the stats
-        logger.info(f"User Stats - Points: {stats['points']}, Level: {stats['level']}, Rank: {stats['rank']}")
+        logger.info("User Stats - Points: %s, Level: %s, Rank: %s", stats['points'], stats['level'], stats['rank'])
         if stats['next_level']:
-            logger.info(f"Next Level: {stats['next_level']} (Needs {stats['points_to_next_level']} more points)")
+            logger.info("Next Level: %s (Needs %s more points)", stats['next_level'], stats['points_to_next_level'])
+        
+        # Breakdown of this session's scans
+        if len(self.recent_scans):
+            counts = self.recent_scans.waste_type_counts()
+            logger.info("Session Scans: %d (%s)", len(self.recent_scans),
+                        ", ".join(f"{waste_type}: {count}" for waste_type, count in sorted(counts.items())))
     
     def _display_achievements(self):
         """Display user achievements."""
@@ -341,13 +444,13 @@ class UserInterface:
         
         # In a real app, this would update the UI
         # For this implementation, we'll just log the achievements
-        logger.info(f"Earned Achievements ({len(achievements['earned'])}):")
+        logger.info("Earned Achievements (%d):", len(achievements['earned']))
         for achievement in achievements['earned'][:3]:  # Show top 3
-            logger.info(f"- {achievement['name']}: {achievement['description']}")
+            logger.info("- %s: %s", achievement['name'], achievement['description'])
         
-        logger.info(f"Upcoming Achievements ({len(achievements['unearned'])}):")
+        logger.info("Upcoming Achievements (%d):", len(achievements['unearned']))
         for achievement in achievements['unearned'][:3]:  # Show top 3
-            logger.info(f"- {achievement['name']}: {achievement['progress']}/{achievement['threshold']} ({achievement['percentage']}%)")
+            logger.info("- %s: %s/%s (%s%%)", achievement['name'], achievement['progress'], achievement['threshold'], achievement['percentage'])
     
     def _display_new_achievements(self, achievements):
         """
@@ -358,9 +461,9 @@ class UserInterface:
         """
         # In a real app, this would show a notification or popup
         # For this implementation, we'll just log the achievements
-        logger.info(f"New Achievements Earned ({len(achievements)}):")
+        logger.info("New Achievements Earned (%d):", len(achievements))
         for achievement in achievements:
-            logger.info(f"- {achievement['name']}: {achievement['description']} (+{achievement['points_reward']} points)")
+            logger.info("- %s: %s (+%s points)", achievement['name'], achievement['description'], achievement['points_reward'])
     
     def _display_leaderboard(self):
         """Display the leaderboard."""
@@ -371,24 +474,54 @@ class UserInterface:
         # For this implementation, we'll just log the leaderboard
         logger.info("Leaderboard:")
         for entry in leaderboard:
-            logger.info(f"{entry['rank']}. {entry['username']} - {entry['points']} points ({entry['level']})")
+            logger.info("%s. %s - %s points (%s)", entry['rank'], entry['username'], entry['points'], entry['level'])
 
 class CameraInterface:
     """Camera interface for capturing waste images."""
     
-    def __init__(self):
-        """Initialize the camera interface."""
+    def __init__(self, frame_width=640, frame_height=480):
+        """
+        Initialize the camera interface.
+        
+        Args:
+            frame_width (int): Requested capture width.
+            frame_height (int): Requested capture height.
+        """
         self.camera = None
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        
+        # Images are encoded and written by a background thread so capture never waits on disk
+        self._write_q = queue.Queue(maxsize=8)
+        self._writer = threading.Thread(target=self._write_images, name="camera-writer", daemon=True)
+        self._writer.start()
         logger.info("Camera interface initialized")
     
     def open_camera(self):
-        """Open the camera."""
+        """Open the camera, reusing it if it is already open."""
+        if self.camera is not None and self.camera.isOpened():
+            return True
+        
         try:
-            self.camera = cv2.VideoCapture(0)  # 0 is usually the default camera
+            # Use the native capture backend where there is one
+            if sys.platform.startswith('linux'):
+                backend = cv2.CAP_V4L2
+            elif sys.platform == 'win32':
+                backend = cv2.CAP_DSHOW
+            else:
+                backend = cv2.CAP_ANY
+            self.camera = cv2.VideoCapture(0, backend)  # 0 is usually the default camera
             if not self.camera.isOpened():
                 logger.error("Failed to open camera")
                 return False
             
+            # Ask for compressed MJPG frames at the target size instead of raw YUYV at
+            # the sensor's native resolution, and keep only the newest frame buffered
+            self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
+            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
+            self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
             logger.info("Camera opened successfully")
             return True
         except Exception as e:
@@ -420,32 +553,42 @@ class CameraInterface:
     
     def save_image(self, image, filename):
         """
-        Save an image to disk.
+        Queue an image to be saved to disk by the background writer.
         
         Args:
             image (numpy.ndarray): The image to save.
             filename (str): The filename to save to.
             
         Returns:
-            bool: True if successful, False otherwise.
+            bool: True if the image was queued, False if the writer is backed up.
         """
         try:
-            directory = os.path.dirname(filename)
-            os.makedirs(directory, exist_ok=True)
-            
-            result = cv2.imwrite(filename, image)
-            if not result:
-                logger.error(f"Failed to save image to {filename}")
-                return False
-            
-            logger.info(f"Image saved to {filename}")
+            self._write_q.put_nowait((image.copy(), filename))
             return True
-        except Exception as e:
-            logger.error(f"Error saving image: {e}", exc_info=True)
+        except queue.Full:
+            logger.error("Image write queue full, dropping %s", filename)
             return False
     
+    def _write_images(self):
+        """Write queued images to disk; runs on the writer thread."""
+        while True:
+            image, filename = self._write_q.get()
+            try:
+                directory = os.path.dirname(filename)
+                os.makedirs(directory, exist_ok=True)
+                
+                if cv2.imwrite(filename, image):
+                    logger.info("Image saved to %s", filename)
+                else:
+                    logger.error("Failed to save image to %s", filename)
+            except Exception as e:
+                logger.error(f"Error saving image: {e}", exc_info=True)
+            finally:
+                self._write_q.task_done()
+    
     def close_camera(self):
-        """Close the camera."""
+        """Close the camera, waiting for queued images to be written."""
+        self._write_q.join()
         if self.camera:
             self.camera.release()
             logger.info("Camera closed")
@@ -4,23 +4,96 @@ Routes module for RecycleRight web interface.
 
 import os
 import uuid
-from flask import render_template, request, jsonify, session, redirect, url_for, flash
+import hashlib
+import json
+from flask import render_template, request, jsonify, session, redirect, url_for, flash, g, send_from_directory
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.exceptions import HTTPException, BadRequest
 import pymongo.errors
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+# streaming-form-data is optional; without it uploads go through werkzeug's form parser
+try:
+    from streaming_form_data import StreamingFormDataParser
+    from streaming_form_data.targets import FileTarget
+    from streaming_form_data.parser import ParseFailedException
+except ImportError:
+    StreamingFormDataParser = None
+
+# gevent is optional; under its workers password hashing runs on a native thread
+try:
+    from gevent import get_hub
+    from gevent.monkey import is_module_patched
+except ImportError:
+    get_hub = None
+
+# Flask-Compress is optional; without it responses are sent uncompressed
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 from data.database import get_db
-from models.waste_classifier import WasteClassifier
+from models.waste_classifier import WasteClassifier, decode_image
 from api.geolocation import GeolocationService
+from ui.scan_jobs import ScanJobQueue
 import config
 
 logger = logging.getLogger(__name__)
 
+# Buffer size for copying uploads to disk; large buffers mean fewer write syscalls for photos
+UPLOAD_BUFFER_SIZE = 1 << 20
+
+# Realistic sample activity shown on the dashboard until a user has 5 scans of their own
+MOCK_ACTIVITY = (
+    {
+        "date": "2023-01-15 10:30",
+        "type": "Challenge",
+        "details": "Completed 'First Steps' challenge",
+        "points": 50  # Challenges typically give more points
+    },
+    {
+        "date": "2023-01-10 15:45",
+        "type": "Scan",
+        "details": "Scanned plastic_bottle",
+        "points": config.POINTS_PER_SCAN
+    },
+    {
+        "date": "2023-01-10 15:50",
+        "type": "Disposal",
+        "details": "Confirmed proper disposal of plastic_bottle",
+        "points": config.POINTS_PER_CORRECT_DISPOSAL
+    },
+    {
+        "date": "2023-01-05 09:20",
+        "type": "Scan",
+        "details": "Scanned e_waste",
+        "points": config.POINTS_PER_SCAN + 5  # Bonus for hard-to-recycle items
+    },
+    {
+        "date": "2023-01-05 09:25",
+        "type": "Achievement",
+        "details": "Earned 'Eco Warrior' badge",
+        "points": 30
+    }
+)
+
+# Waste types that get recycling-bin guidelines when the database has none
+RECYCLABLE_TYPES = frozenset({
+    'plastic_bottle', 'glass_bottle', 'aluminum_can', 'paper',
+    'cardboard', 'plastic_container', 'metal', 'tetra_pak'
+})
+
 def register_routes(app):
     """Register routes with the Flask application."""
     
+    # Compress HTML and JSON responses using the COMPRESS_* settings from config
+    if Compress is not None:
+        Compress(app)
+    
     # Initialize services
     try:
         db = get_db()
@@ -55,24 +128,118 @@ def register_routes(app):
     app.config['geo_service'] = geo_service
     app.config['points_system'] = points_system
     
+    # Background analysis for scan uploads made with ?async=1
+    scan_jobs = ScanJobQueue(
+        max_workers=config.SCAN_WORKERS,
+        result_ttl=config.SCAN_RESULT_TTL,
+        redis_url=config.REDIS_URL
+    )
+    
+    # Runs the dashboard's recent-scans query while the rest of the page is fetched
+    dashboard_io = ThreadPoolExecutor(max_workers=config.DASHBOARD_WORKERS, thread_name_prefix='dashboard')
+    
     # Add Google Maps API key to app config
     app.config['GOOGLE_MAPS_API_KEY'] = config.GOOGLE_MAPS_API_KEY
 
-    def check_db():
-        """Check if database is available and reconnect if necessary."""
-        nonlocal db
-        if db is None:
+    def request_db():
+        """
+        Get the database for the current request, connecting if necessary.
+        
+        Returns:
+            Database: The shared database instance, or None if MongoDB is unavailable.
+        """
+        if 'db' not in g:
             try:
-                db = get_db()
+                g.db = get_db()
             except Exception as e:
                 app.logger.error(f"Database connection failed: {e}")
-                return False
-        return True
+                g.db = None
+        if g.db is None or not g.db.available:
+            return None
+        return g.db
+
+    def run_blocking(fn, *args):
+        """
+        Call a CPU-heavy function that releases the GIL, such as a password KDF.
+        
+        Under gevent workers the call runs on the hub's native thread pool so the
+        worker's other greenlets keep being served; otherwise it runs directly.
+        """
+        if get_hub is not None and is_module_patched('threading'):
+            return get_hub().threadpool.apply(fn, args)
+        return fn(*args)
+
+    def cacheable(response, max_age):
+        """
+        Let browsers and proxies reuse a response that is the same for every user.
+        
+        Args:
+            response (Response): Response to mark as cacheable.
+            max_age (int): Seconds it may be reused without revalidating.
+            
+        Returns:
+            Response: The response, or a 304 if the client already has this version.
+        """
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.add_etag()
+        return response.make_conditional(request)
+
+    allowed_extensions = frozenset({'png', 'jpg', 'jpeg', 'gif'})
 
     def allowed_file(filename):
         """Check if file is allowed based on extension."""
-        return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in {'png', 'jpg', 'jpeg', 'gif'}
+        _, dot, extension = filename.rpartition('.')
+        return bool(dot) and extension.lower() in allowed_extensions
+
+    def receive_upload(folder):
+        """
+        Write the 'file' part of a multipart upload to a temporary file in folder.
+        
+        With streaming-form-data installed, the request body is parsed chunk by chunk
+        straight to disk instead of being buffered by werkzeug's form parser first.
+        
+        Returns:
+            tuple: (temp_path, filename), where filename is the client's filename or
+                None if the request has no file part. temp_path is None when nothing
+                was written (no file part or an empty filename).
+                
+        Raises:
+            HTTPException: If the body is malformed (400), the client disconnects (400)
+                or the body exceeds MAX_CONTENT_LENGTH (413). Nothing is left on disk.
+        """
+        temp_path = os.path.join(folder, f".{uuid.uuid4()}.part")
+        
+        try:
+            if StreamingFormDataParser is None:
+                if 'file' not in request.files:
+                    return None, None
+                file = request.files['file']
+                if not file.filename:
+                    return None, file.filename
+                file.save(temp_path, buffer_size=UPLOAD_BUFFER_SIZE)
+                return temp_path, file.filename
+            
+            target = FileTarget(temp_path)
+            parser = StreamingFormDataParser(headers=request.headers)
+            parser.register('file', target)
+            while True:
+                chunk = request.stream.read(65536)
+                if not chunk:
+                    break
+                parser.data_received(chunk)
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            if StreamingFormDataParser is not None and isinstance(e, ParseFailedException):
+                raise BadRequest('Malformed upload') from e
+            raise
+        
+        if not target.multipart_filename:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None, target.multipart_filename
+        return temp_path, target.multipart_filename
 
     @app.route('/')
     def home():
@@ -82,17 +249,24 @@ def register_routes(app):
     @app.route('/login', methods=['GET', 'POST'])
     def login():
         """Handle user login."""
-        if not check_db():
+        db = request_db()
+        if db is None:
             flash('Service temporarily unavailable. Please try again later.', 'error')
             return render_template('login.html')
         
         if request.method == 'POST':
-            username = request.form.get('username')
-            password = request.form.get('password')
+            form = request.form
+            username = form.get('username')
+            password = form.get('password')
             
             try:
                 user = db.get_user(username=username)
-                if user and check_password_hash(user['password_hash'], password):
+                if user and run_blocking(check_password_hash, user['password_hash'], password):
+                    # Rehash passwords stored with an older method now that we have the plaintext
+                    if not user['password_hash'].startswith(config.PASSWORD_HASH_METHOD + '$'):
+                        db.update_user_password_hash(
+                            user['id'], run_blocking(generate_password_hash, password, config.PASSWORD_HASH_METHOD)
+                        )
                     session['user_id'] = user['id']
                     flash('Login successful!', 'success')
                     return redirect(url_for('dashboard'))
@@ -107,21 +281,23 @@ def register_routes(app):
     @app.route('/register', methods=['GET', 'POST'])
     def register():
         """Handle user registration."""
-        if not check_db():
+        db = request_db()
+        if db is None:
             flash('Service temporarily unavailable. Please try again later.', 'error')
             return render_template('register.html')
         
         if request.method == 'POST':
-            username = request.form.get('username')
-            email = request.form.get('email')
-            password = request.form.get('password')
+            form = request.form
+            username = form.get('username')
+            email = form.get('email')
+            password = form.get('password')
             
             try:
-                if db.get_user(username=username):
+                if db.get_user(username=username, projection={"_id": 1}):
                     flash('Username already exists', 'error')
                     return render_template('register.html')
                 
-                password_hash = generate_password_hash(password)
+                password_hash = run_blocking(generate_password_hash, password, config.PASSWORD_HASH_METHOD)
                 user_id = db.add_user(username, email, password_hash)
                 
                 if user_id:
@@ -138,33 +314,50 @@ def register_routes(app):
     @app.route('/logout')
     def logout():
         """Handle user logout."""
-        session.pop('user_id', None)
+        user_id = session.pop('user_id', None)
+        db = request_db()
+        if user_id and db is not None:
+            db.evict_user(user_id)
         flash('You have been logged out', 'info')
         return redirect(url_for('home'))
 
     @app.route('/dashboard')
     def dashboard():
         """Render user dashboard."""
-        if 'user_id' not in session:
+        user_id = session.get('user_id')
+        if user_id is None:
             return redirect(url_for('login'))
         
-        if not check_db():
+        db = request_db()
+        if db is None:
             flash('Service temporarily unavailable. Please try again later.', 'error')
             return redirect(url_for('home'))
         
         try:
-            user = db.get_user(user_id=session['user_id'])
-            if not user:
+            # Start on the recent scans; they don't depend on anything below
+            recent_scans = dashboard_io.submit(
+                lambda user_id: list(db.db.scans.find(
+                    {"user_id": user_id},
+                    projection={"timestamp": 1, "waste_type": 1, "points_earned": 1, "_id": 0},
+                    sort=[("timestamp", -1)],
+                    limit=5
+                )),
+                db.get_object_id(user_id)
+            )
+            
+            # Get the user, their stats and active challenges in one query
+            bundle = db.get_dashboard_bundle(user_id)
+            if not bundle:
                 flash('User not found. Please log in again.', 'error')
                 return redirect(url_for('logout'))
-                
-            # Get user stats
-            stats = db.get_user_stats(session['user_id'])
+            
+            user = bundle['user']
+            stats = bundle['stats']
             app.logger.debug(f"Retrieved user stats: {stats}")
             if not stats:
                 app.logger.info("No stats found for user, creating default stats")
                 stats = {
-                    "user_id": session['user_id'],
+                    "user_id": user_id,
                     "points": user.get('points', 0),
                     "level": user.get('level', 'Beginner'),
                     "rank": 1,
@@ -177,7 +370,7 @@ def register_routes(app):
                 # Ensure items_scanned is populated
                 if 'items_scanned' not in stats or stats['items_scanned'] is None:
                     app.logger.debug("items_scanned not in stats, adding default value")
-                    stats['items_scanned'] = db.count_user_scans(session['user_id'])
+                    stats['items_scanned'] = db.count_user_scans(user_id)
                     app.logger.debug(f"Set items_scanned to {stats['items_scanned']}")
                 
                 # Calculate level progress percentage if not already set
@@ -188,10 +381,7 @@ def register_routes(app):
                     stats['level_progress'] = min(int((current_points / total_level_points) * 100), 99)
                     app.logger.debug(f"Calculated level_progress: {stats['level_progress']}%")
             
-            # Get active challenges
-            challenges = db.get_user_active_challenges(session['user_id'])
-            if challenges is None:
-                challenges = []
+            challenges = bundle['challenges']
                 
             # Get nearby recycling centers using default location
             recycling_centers = []
@@ -202,14 +392,9 @@ def register_routes(app):
                     recycling_centers = geo_service.find_recycling_centers(
                         user_location.get('lat', 37.7749),  # Default to San Francisco
                         user_location.get('lng', -122.4194),
-                        radius=10
+                        radius=10,
+                        units='miles'
                     )
-                    
-                    # Convert distance from km to miles
-                    for center in recycling_centers:
-                        if 'distance' in center:
-                            # Convert km to miles (1 km = 0.621371 miles)
-                            center['distance'] = center['distance'] * 0.621371
                 except Exception as e:
                     app.logger.error(f"Error finding recycling centers: {e}", exc_info=True)
             
@@ -217,11 +402,7 @@ def register_routes(app):
             recent_activity = []
             try:
                 # Get recent scans
-                scans = db.db.scans.find(
-                    {"user_id": db.get_object_id(session['user_id'])},
-                    sort=[("timestamp", -1)],
-                    limit=5
-                )
+                scans = recent_scans.result()
                 
                 for scan in scans:
                     # Get points from the scan record or use the default from config
@@ -229,7 +410,6 @@ def register_routes(app):
                     
                     # If points_earned is 0 or not set, use the default value from config
                     if points_earned == 0:
-                        import config
                         points_earned = config.POINTS_PER_SCAN
                         
                         # Add bonus for certain waste types (similar to how it's handled in points_system.py)
@@ -246,48 +426,9 @@ def register_routes(app):
             except Exception as e:
                 app.logger.error(f"Error getting recent activity: {e}", exc_info=True)
                 
-            # If we have less than 5 items, add some mock data
+            # If we have less than 5 items, add enough mock data to reach 5
             if len(recent_activity) < 5:
-                # Import config for consistent values
-                import config
-                
-                # Add some realistic mock data with appropriate point values
-                mock_activities = [
-                    {
-                        "date": "2023-01-15 10:30",
-                        "type": "Challenge",
-                        "details": "Completed 'First Steps' challenge",
-                        "points": 50  # Challenges typically give more points
-                    },
-                    {
-                        "date": "2023-01-10 15:45", 
-                        "type": "Scan",
-                        "details": "Scanned plastic_bottle",
-                        "points": config.POINTS_PER_SCAN
-                    },
-                    {
-                        "date": "2023-01-10 15:50",
-                        "type": "Disposal",
-                        "details": "Confirmed proper disposal of plastic_bottle",
-                        "points": config.POINTS_PER_CORRECT_DISPOSAL
-                    },
-                    {
-                        "date": "2023-01-05 09:20",
-                        "type": "Scan",
-                        "details": "Scanned e_waste",
-                        "points": config.POINTS_PER_SCAN + 5  # Bonus for hard-to-recycle items
-                    },
-                    {
-                        "date": "2023-01-05 09:25",
-                        "type": "Achievement",
-                        "details": "Earned 'Eco Warrior' badge",
-                        "points": 30
-                    }
-                ]
-                
-                # Add enough mock activities to reach 5 total items
-                needed_items = 5 - len(recent_activity)
-                recent_activity.extend(mock_activities[:needed_items])
+                recent_activity.extend(MOCK_ACTIVITY[:5 - len(recent_activity)])
             
             return render_template('dashboard.html', 
                                   user=user, 
@@ -309,55 +450,104 @@ def register_routes(app):
             
         return render_template('scan.html')
 
-    @app.route('/scan/upload', methods=['POST'])
-    def scan_upload():
-        """Handle image upload for scanning."""
-        if 'user_id' not in session:
-            app.logger.warning("Scan upload without authentication")
-            return jsonify({'success': False, 'error': 'Authentication required'}), 401
-        
-        app.logger.info("Received scan upload request")
-        
-        # Check if the post request has the file part
-        if 'file' not in request.files:
-            app.logger.warning("No file part in scan upload request")
-            return jsonify({'success': False, 'error': 'No file part'}), 400
-        
-        file = request.files['file']
+    def file_sha256(filepath):
+        """Return the hex SHA-256 digest of a file's contents."""
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def load_analysis(digest, kind):
+        """
+        Get a cached analysis of an image.
         
-        app.logger.debug(f"Received scan file: {file.filename}, size: {file.content_length if hasattr(file, 'content_length') else 'unknown'}")
+        Args:
+            digest (str): SHA-256 of the image contents.
+            kind (str): Analysis source, 'gpt' or 'classifier'.
+            
+        Returns:
+            The cached analysis, or None if there is none or no cache is configured.
+        """
+        cache = getattr(app.config.get('database'), 'cache', None)
+        if cache is None:
+            return None
+        try:
+            cached = cache.get(f"scan_analysis:{kind}:{digest}")
+            return json.loads(cached) if cached is not None else None
+        except Exception as e:
+            app.logger.warning(f"Error reading cached scan analysis: {e}")
+            return None
+
+    def save_analysis(digest, kind, analysis):
+        """Cache the analysis of an image for SCAN_CACHE_TTL seconds."""
+        cache = getattr(app.config.get('database'), 'cache', None)
+        if cache is None:
+            return
+        try:
+            cache.setex(f"scan_analysis:{kind}:{digest}", config.SCAN_CACHE_TTL, json.dumps(analysis, default=float))
+        except Exception as e:
+            app.logger.warning(f"Error caching scan analysis: {e}")
+
+    def mock_scan_response(image_id):
+        """
+        Build the scan response used when no classifier is available.
         
-        # If user does not select file, browser also submits an empty part
-        if file.filename == '':
-            app.logger.warning("Empty filename in scan upload")
-            return jsonify({'success': False, 'error': 'No selected file'}), 400
+        Args:
+            image_id (str): ID of the saved scan image, or None if it wasn't saved.
+            
+        Returns:
+            dict: Scan response with fixed mock predictions.
+        """
+        mock_predictions = [
+            {"label": "plastic_bottle", "confidence": 0.95},
+            {"label": "plastic_container", "confidence": 0.45},
+            {"label": "glass_bottle", "confidence": 0.35}
+        ]
+        return {
+            'success': True,
+            'image_id': image_id,
+            'predictions': mock_predictions,
+            'top_prediction': mock_predictions[0],
+            'item_name': mock_predictions[0]['label'].replace('_', ' ').title(),
+            'scan_id': str(uuid.uuid4()),
+            'message': 'Using mock classification (classifier not available)'
+        }
+    
+    def analyze_scan(filepath, user_id, db):
+        """
+        Classify a saved scan image, record the scan and award points.
         
-        if file and allowed_file(file.filename):
-            # Create a unique filename
-            filename = secure_filename(f"{uuid.uuid4()}_{file.filename}")
-            user_folder = os.path.join(app.config['UPLOAD_FOLDER'], str(session['user_id']))
-            os.makedirs(user_folder, exist_ok=True)
-            filepath = os.path.join(user_folder, filename)
+        Args:
+            filepath (str): Path of the uploaded image.
+            user_id (str): ID of the scanning user.
+            db (Database): Database from the request's request_db(); this may run on a
+                ScanJobQueue thread, outside the request context.
             
-            # Save the file
-            file.save(filepath)
-            app.logger.info(f"Saved scan image to {filepath}")
+        Returns:
+            tuple: (response, status) for the scan upload endpoint.
+        """
+        # Re-uploads of an identical image reuse the earlier analysis; the scan itself
+        # is still recorded and rewarded below
+        digest = file_sha256(filepath)
+        
+        # Try to use GPT-4o image analyzer first, fall back to classifier if not available
+        try:
+            # Import the GPT analyzer
+            from api.gpt_analyzer import GPTImageAnalyzer
             
-            # Try to use GPT-4o image analyzer first, fall back to classifier if not available
+            # Initialize the GPT analyzer
+            gpt_analyzer = None
             try:
-                # Import the GPT analyzer
-                from api.gpt_analyzer import GPTImageAnalyzer
-                
-                # Initialize the GPT analyzer
-                gpt_analyzer = None
-                try:
-                    gpt_analyzer = GPTImageAnalyzer()
-                    app.logger.info("Successfully initialized GPT-4o image analyzer")
-                except Exception as e:
-                    app.logger.warning(f"Could not initialize GPT-4o analyzer: {e}. Will fall back to classifier.")
-                
-                # If GPT analyzer is available, use it
-                if gpt_analyzer:
+                gpt_analyzer = GPTImageAnalyzer()
+                app.logger.info("Successfully initialized GPT-4o image analyzer")
+            except Exception as e:
+                app.logger.warning(f"Could not initialize GPT-4o analyzer: {e}. Will fall back to classifier.")
+            
+            # If GPT analyzer is available, use it
+            if gpt_analyzer:
+                analysis_result = load_analysis(digest, 'gpt')
+                if analysis_result is None:
                     app.logger.info("Analyzing image with GPT-4o")
                     analysis_result = gpt_analyzer.analyze_image(filepath)
                     
@@ -366,173 +556,84 @@ def register_routes(app):
                         app.logger.error(f"GPT-4o analysis error: {analysis_result['error']}")
                         raise Exception(f"GPT analysis failed: {analysis_result['error']}")
                     
-                    # Extract waste type from analysis
-                    waste_type = analysis_result.get('waste_type', 'mixed')
-                    
-                    # Map waste_type to label format expected by the application
-                    label_mapping = {
-                        'recyclable': 'plastic_bottle',  # Default recyclable type
-                        'compostable': 'food_waste',
-                        'trash': 'styrofoam',
-                        'mixed': 'plastic_container',
-                        'unknown': 'plastic_container'
-                    }
-                    
-                    # Find more specific label if available in material composition
-                    materials = analysis_result.get('material_composition', [])
-                    for material in materials:
-                        material_lower = material.lower()
-                        if 'aluminum' in material_lower or 'metal' in material_lower:
-                            label_mapping['recyclable'] = 'aluminum_can' if 'can' in material_lower else 'metal'
-                            break
-                        elif 'plastic' in material_lower and 'bottle' in material_lower:
-                            label_mapping['recyclable'] = 'plastic_bottle'
-                            break
-                        elif 'plastic' in material_lower and 'container' in material_lower:
-                            label_mapping['recyclable'] = 'plastic_container'
-                            break
-                        elif 'glass' in material_lower:
-                            label_mapping['recyclable'] = 'glass_bottle'
-                            break
-                        elif 'paper' in material_lower:
-                            label_mapping['recyclable'] = 'paper'
-                            break
-                        elif 'cardboard' in material_lower:
-                            label_mapping['recyclable'] = 'cardboard'
-                            break
-                    
-                    # Create a prediction in the format expected by the application
-                    top_prediction = {
-                        'label': label_mapping.get(waste_type, 'plastic_container'),
-                        'confidence': 0.95  # High confidence since GPT-4o is more reliable
-                    }
-                    
-                    # Create additional predictions for UI display
-                    predictions = [top_prediction]
-                    for material in materials[:2]:  # Add up to 2 additional materials
-                        material_lower = material.lower()
-                        for waste_label in label_mapping.values():
-                            if waste_label != top_prediction['label']:
-                                predictions.append({
-                                    'label': waste_label,
-                                    'confidence': 0.45  # Lower confidence for secondary predictions
-                                })
-                                break
-                    
-                    # Add more variety if needed
-                    while len(predictions) < 3:
-                        for waste_label in label_mapping.values():
-                            if all(p['label'] != waste_label for p in predictions):
-                                predictions.append({
-                                    'label': waste_label,
-                                    'confidence': 0.35  # Even lower confidence
-                                })
-                                break
-                    
-                    # Record scan and award points
-                    scan_id = None
-                    points_earned = 0
-                    
-                    if 'user_id' in session:
-                        db = app.config.get('database')
-                        points_system = app.config.get('points_system')
-                        
-                        # Get user location
-                        location = None
-                        if db:
-                            user = db.get_user(user_id=session['user_id'])
-                            if user and user.get('location_lat') and user.get('location_lon'):
-                                location = (user['location_lat'], user['location_lon'])
-                        
-                        # Record scan in database
-                        if db:
-                            app.logger.info("Recording scan in database")
-                            scan_id = db.record_scan(
-                                user_id=session['user_id'],
-                                waste_type=top_prediction['label'],
-                                confidence=top_prediction['confidence'],
-                                image_path=filepath,
-                                location=location
-                            )
-                        
-                        # Award points
-                        if points_system:
-                            app.logger.info(f"Awarding points for scan to user {session['user_id']}")
-                            points_earned = points_system.award_scan_points(
-                                user_id=session['user_id'],
-                                waste_type=top_prediction['label'],
-                                image_path=filepath
-                            )
-                    
-                    # Prepare response with GPT analysis data
-                    response = {
-                        'success': True,
-                        'file_path': filepath,
-                        'predictions': predictions,
-                        'top_prediction': top_prediction,
-                        'item_name': top_prediction['label'].replace('_', ' ').title(),
-                        'scan_id': scan_id,
-                        'points_earned': points_earned,
-                        'gpt_analysis': {
-                            'material_composition': analysis_result.get('material_composition', []),
-                            'recyclability': analysis_result.get('recyclability', []),
-                            'disposal_suggestions': analysis_result.get('disposal_suggestions', []),
-                            'waste_type': waste_type
-                        }
-                    }
-                    
-                    app.logger.debug(f"Returning GPT-4o scan response: {response}")
-                    return jsonify(response), 200
-            
-            except Exception as e:
-                app.logger.warning(f"Error using GPT-4o analyzer, falling back to classifier: {e}", exc_info=True)
-            
-            # Fall back to the classifier if GPT-4o failed
-            # Get the classifier
-            classifier = app.config.get('classifier')
-            
-            if not classifier:
-                app.logger.error("Waste classifier not configured for scan")
-                # Return mock predictions if classifier is not available
-                mock_predictions = [
-                    {"label": "plastic_bottle", "confidence": 0.95},
-                    {"label": "plastic_container", "confidence": 0.45},
-                    {"label": "glass_bottle", "confidence": 0.35}
-                ]
-                app.logger.warning("Using mock predictions for scan upload")
+                    save_analysis(digest, 'gpt', analysis_result)
+                else:
+                    app.logger.info("Using cached GPT-4o analysis for scan")
                 
-                response = {
-                    'success': True,
-                    'file_path': filepath,
-                    'predictions': mock_predictions,
-                    'top_prediction': mock_predictions[0],
-                    'item_name': mock_predictions[0]['label'].replace('_', ' ').title(),
-                    'scan_id': str(uuid.uuid4()),
-                    'message': 'Using mock classification (classifier not available)'
+                # Extract waste type from analysis
+                waste_type = analysis_result.get('waste_type', 'mixed')
+                
+                # Map waste_type to label format expected by the application
+                label_mapping = {
+                    'recyclable': 'plastic_bottle',  # Default recyclable type
+                    'compostable': 'food_waste',
+                    'trash': 'styrofoam',
+                    'mixed': 'plastic_container',
+                    'unknown': 'plastic_container'
                 }
                 
-                app.logger.debug(f"Returning mock scan response: {response}")
-                return jsonify(response), 200
-            
-            # Process the image with the classifier
-            app.logger.info("Getting predictions from classifier for scan")
-            try:
-                # Get predictions
-                predictions = classifier.get_all_predictions(filepath)
-                top_prediction = predictions[0] if predictions else None
+                # Find more specific label if available in material composition
+                materials = analysis_result.get('material_composition', [])
+                for material in materials:
+                    material_lower = material.lower()
+                    if 'aluminum' in material_lower or 'metal' in material_lower:
+                        label_mapping['recyclable'] = 'aluminum_can' if 'can' in material_lower else 'metal'
+                        break
+                    elif 'plastic' in material_lower and 'bottle' in material_lower:
+                        label_mapping['recyclable'] = 'plastic_bottle'
+                        break
+                    elif 'plastic' in material_lower and 'container' in material_lower:
+                        label_mapping['recyclable'] = 'plastic_container'
+                        break
+                    elif 'glass' in material_lower:
+                        label_mapping['recyclable'] = 'glass_bottle'
+                        break
+                    elif 'paper' in material_lower:
+                        label_mapping['recyclable'] = 'paper'
+                        break
+                    elif 'cardboard' in material_lower:
+                        label_mapping['recyclable'] = 'cardboard'
+                        break
                 
-                # Record scan and award points if prediction was successful
+                # Create a prediction in the format expected by the application
+                top_prediction = {
+                    'label': label_mapping.get(waste_type, 'plastic_container'),
+                    'confidence': 0.95  # High confidence since GPT-4o is more reliable
+                }
+                
+                # Create additional predictions for UI display
+                predictions = [top_prediction]
+                for material in materials[:2]:  # Add up to 2 additional materials
+                    material_lower = material.lower()
+                    for waste_label in label_mapping.values():
+                        if waste_label != top_prediction['label']:
+                            predictions.append({
+                                'label': waste_label,
+                                'confidence': 0.45  # Lower confidence for secondary predictions
+                            })
+                            break
+                
+                # Add more variety if needed
+                while len(predictions) < 3:
+                    for waste_label in label_mapping.values():
+                        if all(p['label'] != waste_label for p in predictions):
+                            predictions.append({
+                                'label': waste_label,
+                                'confidence': 0.35  # Even lower confidence
+                            })
+                            break
+                
+                # Record scan and award points
                 scan_id = None
                 points_earned = 0
                 
-                if top_prediction and 'user_id' in session:
-                    db = app.config.get('database')
+                if user_id is not None:
                     points_system = app.config.get('points_system')
                     
                     # Get user location
                     location = None
                     if db:
-                        user = db.get_user(user_id=session['user_id'])
+                        user = db.get_user(user_id=user_id, projection={"location": 1})
                         if user and user.get('location_lat') and user.get('location_lon'):
                             location = (user['location_lat'], user['location_lon'])
                     
@@ -540,7 +641,7 @@ def register_routes(app):
                     if db:
                         app.logger.info("Recording scan in database")
                         scan_id = db.record_scan(
-                            user_id=session['user_id'],
+                            user_id=user_id,
                             waste_type=top_prediction['label'],
                             confidence=top_prediction['confidence'],
                             image_path=filepath,
@@ -549,46 +650,230 @@ def register_routes(app):
                     
                     # Award points
                     if points_system:
-                        app.logger.info(f"Awarding points for scan to user {session['user_id']}")
+                        app.logger.info(f"Awarding points for scan to user {user_id}")
                         points_earned = points_system.award_scan_points(
-                            user_id=session['user_id'],
+                            user_id=user_id,
                             waste_type=top_prediction['label'],
                             image_path=filepath
                         )
                 
-                # Prepare response
+                # Prepare response with GPT analysis data
                 response = {
                     'success': True,
-                    'file_path': filepath,
+                    'image_id': os.path.basename(filepath),
                     'predictions': predictions,
                     'top_prediction': top_prediction,
-                    'item_name': top_prediction['label'].replace('_', ' ').title() if top_prediction else 'Unknown Item',
+                    'item_name': top_prediction['label'].replace('_', ' ').title(),
                     'scan_id': scan_id,
-                    'points_earned': points_earned
+                    'points_earned': points_earned,
+                    'gpt_analysis': {
+                        'material_composition': analysis_result.get('material_composition', []),
+                        'recyclability': analysis_result.get('recyclability', []),
+                        'disposal_suggestions': analysis_result.get('disposal_suggestions', []),
+                        'waste_type': waste_type
+                    }
                 }
                 
-                app.logger.debug(f"Returning scan response: {response}")
-                return jsonify(response), 200
+                app.logger.debug(f"Returning GPT-4o scan response: {response}")
+                return response, 200
+        
+        except Exception as e:
+            app.logger.warning(f"Error using GPT-4o analyzer, falling back to classifier: {e}", exc_info=True)
+        
+        # Fall back to the classifier if GPT-4o failed
+        # Get the classifier
+        classifier = app.config.get('classifier')
+        
+        if not classifier:
+            app.logger.error("Waste classifier not configured for scan")
+            # Return mock predictions if classifier is not available
+            app.logger.warning("Using mock predictions for scan upload")
+            response = mock_scan_response(os.path.basename(filepath))
+            
+            app.logger.debug(f"Returning mock scan response: {response}")
+            return response, 200
+        
+        # Process the image with the classifier
+        app.logger.info("Getting predictions from classifier for scan")
+        try:
+            # Get predictions
+            predictions = load_analysis(digest, 'classifier')
+            if predictions is None:
+                predictions = classifier.get_all_predictions(filepath)
+                if predictions:
+                    save_analysis(digest, 'classifier', predictions)
+            top_prediction = predictions[0] if predictions else None
+            
+            # Record scan and award points if prediction was successful
+            scan_id = None
+            points_earned = 0
+            
+            if top_prediction and user_id is not None:
+                points_system = app.config.get('points_system')
                 
-            except Exception as e:
-                app.logger.error(f"Error processing scan image: {e}", exc_info=True)
-                return jsonify({
-                    'success': False,
-                    'error': 'Error processing image. Please try again.'
-                }), 500
+                # Get user location
+                location = None
+                if db:
+                    user = db.get_user(user_id=user_id, projection={"location": 1})
+                    if user and user.get('location_lat') and user.get('location_lon'):
+                        location = (user['location_lat'], user['location_lon'])
+                
+                # Record scan in database
+                if db:
+                    app.logger.info("Recording scan in database")
+                    scan_id = db.record_scan(
+                        user_id=user_id,
+                        waste_type=top_prediction['label'],
+                        confidence=top_prediction['confidence'],
+                        image_path=filepath,
+                        location=location
+                    )
+                
+                # Award points
+                if points_system:
+                    app.logger.info(f"Awarding points for scan to user {user_id}")
+                    points_earned = points_system.award_scan_points(
+                        user_id=user_id,
+                        waste_type=top_prediction['label'],
+                        image_path=filepath
+                    )
+            
+            # Prepare response
+            response = {
+                'success': True,
+                'image_id': os.path.basename(filepath),
+                'predictions': predictions,
+                'top_prediction': top_prediction,
+                'item_name': top_prediction['label'].replace('_', ' ').title() if top_prediction else 'Unknown Item',
+                'scan_id': scan_id,
+                'points_earned': points_earned
+            }
+            
+            app.logger.debug(f"Returning scan response: {response}")
+            return response, 200
+            
+        except Exception as e:
+            app.logger.error(f"Error processing scan image: {e}", exc_info=True)
+            return {
+                'success': False,
+                'error': 'Error processing image. Please try again.'
+            }, 500
+
+    @app.route('/scan/upload', methods=['POST'])
+    def scan_upload():
+        """Handle image upload for scanning."""
+        user_id = session.get('user_id')
+        if user_id is None:
+            app.logger.warning("Scan upload without authentication")
+            return jsonify({'success': False, 'error': 'Authentication required'}), 401
+        
+        app.logger.info("Received scan upload request")
+        
+        # With neither GPT-4o nor the classifier there's nothing to analyze, so don't store the image
+        if not config.OPENAI_API_KEY and not app.config.get('classifier'):
+            app.logger.warning("Using mock predictions for scan upload")
+            return jsonify(mock_scan_response(None)), 200
+        
+        # Reject oversized uploads before anything is written to disk
+        max_length = app.config.get('MAX_CONTENT_LENGTH')
+        if max_length and request.content_length and request.content_length > max_length:
+            app.logger.warning(f"Scan upload too large: {request.content_length} bytes")
+            return jsonify({'success': False, 'error': 'File too large'}), 413
+        
+        db = request_db()
+        if db is None:
+            app.logger.error("Database unavailable for scan upload")
+            return jsonify({'success': False, 'error': 'Service temporarily unavailable'}), 503
+        
+        # Stream the file to disk under a temporary name, moved into place once validated
+        user_folder = os.path.join(app.config['UPLOAD_FOLDER'], str(user_id))
+        os.makedirs(user_folder, exist_ok=True)
+        try:
+            upload_path, upload_filename = receive_upload(user_folder)
+        except HTTPException as e:
+            app.logger.warning(f"Scan upload failed: {e.description}")
+            return jsonify({'success': False, 'error': e.description}), e.code
         
-        app.logger.warning(f"Invalid file type in scan upload: {file.filename}")
+        # Check if the post request has the file part
+        if upload_filename is None:
+            app.logger.warning("No file part in scan upload request")
+            return jsonify({'success': False, 'error': 'No file part'}), 400
+        
+        # If user does not select file, browser also submits an empty part
+        if upload_filename == '':
+            app.logger.warning("Empty filename in scan upload")
+            return jsonify({'success': False, 'error': 'No selected file'}), 400
+        
+        if app.logger.isEnabledFor(logging.DEBUG):
+            app.logger.debug("Received scan file: %s, size: %s", upload_filename, os.path.getsize(upload_path))
+        
+        if allowed_file(upload_filename):
+            # Create a unique filename
+            filename = secure_filename(f"{uuid.uuid4()}_{upload_filename}")
+            filepath = os.path.join(user_folder, filename)
+            
+            # Save the file
+            os.replace(upload_path, filepath)
+            app.logger.info(f"Saved scan image to {filepath}")
+            
+            # Clients passing ?async=1 get a job ID to poll instead of waiting for the analysis
+            if request.args.get('async') == '1':
+                job_id = scan_jobs.submit(user_id, analyze_scan, filepath, user_id, db)
+                app.logger.info(f"Queued scan analysis job {job_id}")
+                return jsonify({'success': True, 'job_id': job_id}), 202
+            
+            response, status = analyze_scan(filepath, user_id, db)
+            return jsonify(response), status
+        
+        os.remove(upload_path)
+        app.logger.warning(f"Invalid file type in scan upload: {upload_filename}")
         return jsonify({'success': False, 'error': 'File type not allowed'}), 400
     
+    @app.route('/scan/result/<job_id>')
+    def scan_result(job_id):
+        """Return the result of a scan queued by scan_upload, or 202 while it is pending."""
+        if 'user_id' not in session:
+            return jsonify({'success': False, 'error': 'Authentication required'}), 401
+        
+        job = scan_jobs.get(job_id, session['user_id'])
+        if job is None:
+            return jsonify({'success': False, 'error': 'Scan job not found'}), 404
+        if not job.done:
+            return jsonify({'success': True, 'status': 'pending'}), 202
+        
+        response, status = job.result
+        return jsonify(response), status
+    
+    @app.route('/uploads/<image_id>')
+    def uploaded_image(image_id):
+        """Serve one of the signed-in user's scanned images by the image_id a scan returned."""
+        user_id = session.get('user_id')
+        if user_id is None:
+            return jsonify({'success': False, 'error': 'Authentication required'}), 401
+        
+        user_folder = os.path.join(app.config['UPLOAD_FOLDER'], str(user_id))
+        return send_from_directory(user_folder, image_id)
+    
     @app.route('/scan/camera', methods=['POST'])
     def scan_camera():
         """Handle camera capture for scanning."""
-        if 'user_id' not in session:
+        user_id = session.get('user_id')
+        if user_id is None:
             app.logger.warning("Scan camera without authentication")
             return jsonify({'success': False, 'error': 'Authentication required'}), 401
         
         app.logger.info("Received scan camera request")
         
+        # With neither GPT-4o nor the classifier there's nothing to analyze, so don't store the image
+        if not config.OPENAI_API_KEY and not app.config.get('classifier'):
+            app.logger.warning("Using mock predictions for camera scan")
+            return jsonify(mock_scan_response(None)), 200
+        
+        db = request_db()
+        if db is None:
+            app.logger.error("Database unavailable for camera scan")
+            return jsonify({'success': False, 'error': 'Service temporarily unavailable'}), 503
+        
         try:
             # Get JSON data 
             data = request.get_json()
@@ -606,15 +891,13 @@ def register_routes(app):
             
             # Decode base64 data
             import base64
-            import numpy as np
-            import cv2
             from io import BytesIO
             
             image_data = base64.b64decode(image_b64)
             
             # Create unique filename and save
             filename = f"{uuid.uuid4()}_camera.jpg"
-            user_folder = os.path.join(app.config['UPLOAD_FOLDER'], str(session['user_id']))
+            user_folder = os.path.join(app.config['UPLOAD_FOLDER'], str(user_id))
             os.makedirs(user_folder, exist_ok=True)
             filepath = os.path.join(user_folder, filename)
             
@@ -713,14 +996,13 @@ def register_routes(app):
                     scan_id = None
                     points_earned = 0
                     
-                    if 'user_id' in session:
-                        db = app.config.get('database')
+                    if user_id:
                         points_system = app.config.get('points_system')
                         
                         # Get user location
                         location = None
                         if db:
-                            user = db.get_user(user_id=session['user_id'])
+                            user = db.get_user(user_id=user_id, projection={"location": 1})
                             if user and user.get('location_lat') and user.get('location_lon'):
                                 location = (user['location_lat'], user['location_lon'])
                         
@@ -728,7 +1010,7 @@ def register_routes(app):
                         if db:
                             app.logger.info("Recording camera scan in database")
                             scan_id = db.record_scan(
-                                user_id=session['user_id'],
+                                user_id=user_id,
                                 waste_type=top_prediction['label'],
                                 confidence=top_prediction['confidence'],
                                 image_path=filepath,
@@ -737,9 +1019,9 @@ def register_routes(app):
                         
                         # Award points
                         if points_system:
-                            app.logger.info(f"Awarding points for camera scan to user {session['user_id']}")
+                            app.logger.info(f"Awarding points for camera scan to user {user_id}")
                             points_earned = points_system.award_scan_points(
-                                user_id=session['user_id'],
+                                user_id=user_id,
                                 waste_type=top_prediction['label'],
                                 image_path=filepath
                             )
@@ -747,7 +1029,7 @@ def register_routes(app):
                     # Prepare response with GPT analysis data
                     response = {
                         'success': True,
-                        'file_path': filepath,
+                        'image_id': os.path.basename(filepath),
                         'predictions': predictions,
                         'top_prediction': top_prediction,
                         'item_name': top_prediction['label'].replace('_', ' ').title(),
@@ -767,9 +1049,8 @@ def register_routes(app):
             except Exception as e:
                 app.logger.warning(f"Error using GPT-4o analyzer for camera scan, falling back to classifier: {e}", exc_info=True)
             
-            # Convert to OpenCV format for processing
-            nparr = np.frombuffer(image_data, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            # Convert to OpenCV format for processing, decoding at reduced resolution
+            img = decode_image(image_data)
             
             # Get the classifier
             classifier = app.config.get('classifier')
@@ -777,22 +1058,8 @@ def register_routes(app):
             if not classifier or img is None:
                 app.logger.error(f"Classifier not configured or invalid image: classifier={classifier is not None}, image={'valid' if img is not None else 'invalid'}")
                 # Return mock predictions if classifier is not available
-                mock_predictions = [
-                    {"label": "plastic_bottle", "confidence": 0.95},
-                    {"label": "plastic_container", "confidence": 0.45},
-                    {"label": "glass_bottle", "confidence": 0.35}
-                ]
                 app.logger.warning("Using mock predictions for camera scan")
-                
-                response = {
-                    'success': True,
-                    'file_path': filepath,
-                    'predictions': mock_predictions,
-                    'top_prediction': mock_predictions[0],
-                    'item_name': mock_predictions[0]['label'].replace('_', ' ').title(),
-                    'scan_id': str(uuid.uuid4()),
-                    'message': 'Using mock classification (classifier not available)'
-                }
+                response = mock_scan_response(os.path.basename(filepath))
                 
                 app.logger.debug(f"Returning mock camera scan response: {response}")
                 return jsonify(response), 200
@@ -808,14 +1075,13 @@ def register_routes(app):
                 scan_id = None
                 points_earned = 0
                 
-                if top_prediction and 'user_id' in session:
-                    db = app.config.get('database')
+                if top_prediction and user_id:
                     points_system = app.config.get('points_system')
                     
                     # Get user location
                     location = None
                     if db:
-                        user = db.get_user(user_id=session['user_id'])
+                        user = db.get_user(user_id=user_id, projection={"location": 1})
                         if user and user.get('location_lat') and user.get('location_lon'):
                             location = (user['location_lat'], user['location_lon'])
                     
@@ -823,7 +1089,7 @@ def register_routes(app):
                     if db:
                         app.logger.info("Recording camera scan in database")
                         scan_id = db.record_scan(
-                            user_id=session['user_id'],
+                            user_id=user_id,
                             waste_type=top_prediction['label'],
                             confidence=top_prediction['confidence'],
                             image_path=filepath,
@@ -832,9 +1098,9 @@ def register_routes(app):
                     
                     # Award points
                     if points_system:
-                        app.logger.info(f"Awarding points for camera scan to user {session['user_id']}")
+                        app.logger.info(f"Awarding points for camera scan to user {user_id}")
                         points_earned = points_system.award_scan_points(
-                            user_id=session['user_id'],
+                            user_id=user_id,
                             waste_type=top_prediction['label'],
                             image_path=filepath
                         )
@@ -842,7 +1108,7 @@ def register_routes(app):
                 # Prepare response
                 response = {
                     'success': True,
-                    'file_path': filepath,
+                    'image_id': os.path.basename(filepath),
                     'predictions': predictions,
                     'top_prediction': top_prediction,
                     'item_name': top_prediction['label'].replace('_', ' ').title() if top_prediction else 'Unknown Item',
@@ -871,18 +1137,17 @@ def register_routes(app):
     def leaderboard():
         """Render leaderboard page."""
         try:
-            # Get database from app config
-            db = app.config.get('database')
-            if not db:
-                app.logger.error("Database not configured")
+            db = request_db()
+            if db is None:
+                app.logger.error("Database unavailable for leaderboard")
                 flash('Leaderboard service is currently unavailable.', 'error')
-                users = []
-            else:
-                users = db.get_leaderboard(limit=10)
+                return render_template('leaderboard.html', users=[], user_rank=None), 503
+            
+            users = db.get_leaderboard(limit=10)
                 
             # Get current user rank if logged in
             user_rank = None
-            if 'user_id' in session and db:
+            if 'user_id' in session:
                 try:
                     user_id = session['user_id']
                     user_rank = db.get_user_rank(user_id)
@@ -898,12 +1163,19 @@ def register_routes(app):
     @app.route('/api/leaderboard')
     def api_leaderboard():
         """API endpoint for leaderboard data."""
+        db = request_db()
+        if db is None:
+            return jsonify({
+                'success': False,
+                'message': 'Service temporarily unavailable'
+            }), 503
+        
         try:
             top_users = db.get_leaderboard(limit=10)
-            return jsonify({
+            return cacheable(jsonify({
                 'success': True,
                 'leaderboard': top_users
-            })
+            }), config.LEADERBOARD_CACHE_TTL)
         except Exception as e:
             logger.error(f"Error fetching leaderboard: {e}", exc_info=True)
             return jsonify({
@@ -989,51 +1261,15 @@ def register_routes(app):
         # Convert miles to kilometers for the API
         radius_km = radius_miles * 1.60934
         
-        # Check if we're coming from a POST request (address search)
-        if request.method == 'POST' and request.form.get('address'):
-            address = request.form.get('address')
-            logger.info(f"Searching for recycling centers near address: {address} within {radius_miles} miles")
-            
-            try:
-                # Convert address to coordinates
-                geo_service = GeolocationService()
-                location_result = geo_service.get_location_from_address(address)
-                
-                if location_result:
-                    # Update user location - handle tuple or dict return type
-                    if isinstance(location_result, tuple) and len(location_result) == 2:
-                        # Tuple format (lat, lon)
-                        user_location = {"lat": location_result[0], "lon": location_result[1]}
-                    elif isinstance(location_result, dict) and 'lat' in location_result and 'lon' in location_result:
-                        # Dictionary format
-                        user_location = location_result
-                    
-                    logger.info(f"Address converted to coordinates: {user_location}")
-                    
-                    # Store address in session for future reference
-                    session['last_address'] = address
-                    session['user_location'] = user_location
-                    session['radius'] = radius  # Store radius in session
-                else:
-                    # Failed to geocode address
-                    logger.warning(f"Failed to geocode address: {address}")
-                    flash("Could not find the location you entered. Showing recycling centers in Massachusetts instead. Please use this format: street address, town, state, zip code (example: '12 River Road, Andover, MA 01810')", "warning")
-                    search_error = "Using default Massachusetts location - your location could not be found"
-                    # Use the default location
-                    user_location = {"lat": 42.4072, "lon": -71.3824}  # Massachusetts
-            except Exception as e:
-                logger.error(f"Error in address search: {e}", exc_info=True)
-                flash("An error occurred while searching. Please try again.", "danger")
-                search_error = str(e)
+        # An address searched for in the form, or linked to with ?address=
+        searched_address = request.form.get('address') or request.args.get('address')
         
-        # Get address from URL parameter if present
-        elif request.args.get('address'):
-            address = request.args.get('address')
-            logger.info(f"Searching for recycling centers near address from URL: {address} within {radius_miles} miles")
+        if geo_service and searched_address:
+            address = searched_address
+            logger.info(f"Searching for recycling centers near address: {address} within {radius_miles} miles")
             
             try:
                 # Convert address to coordinates
-                geo_service = GeolocationService()
                 location_result = geo_service.get_location_from_address(address)
                 
                 if location_result:
@@ -1078,21 +1314,19 @@ def register_routes(app):
             logger.info(f"Using session location: {user_location} with radius: {radius_miles} miles")
         
         # Find recycling centers near the user's location
-        geo_service = GeolocationService()
-        centers = geo_service.find_recycling_centers(
-            user_location['lat'], 
-            user_location['lon'],
-            radius=radius_km  # Pass the radius in kilometers
-        )
+        centers = []
+        if geo_service:
+            centers = geo_service.find_recycling_centers(
+                user_location['lat'], 
+                user_location['lon'],
+                radius=radius_km,  # Pass the radius in kilometers
+                units='miles'
+            )
+        else:
+            flash("Recycling center search is temporarily unavailable.", "warning")
         
         logger.info(f"Found {len(centers)} recycling centers within {radius_miles} miles")
         
-        # Convert km distances to miles for display
-        for center in centers:
-            if 'distance' in center:
-                # Convert kilometers to miles (1 km = 0.621371 miles)
-                center['distance'] = center['distance'] * 0.621371
-        
         return render_template(
             'centers.html', 
             centers=centers, 
@@ -1109,10 +1343,9 @@ def register_routes(app):
         try:
             app.logger.info(f"Getting recycling guidelines for waste type: {waste_type}")
             
-            # Get database from app config
-            db = app.config.get('database')
-            if not db:
-                app.logger.error("Database not configured")
+            db = request_db()
+            if db is None:
+                app.logger.error("Database unavailable for recycling guidelines")
                 return jsonify({'success': False, 'error': 'Service temporarily unavailable'}), 503
                 
             # Get guidelines from database
@@ -1122,18 +1355,12 @@ def register_routes(app):
             
             if not guidelines:
                 app.logger.info(f"No guidelines found for {waste_type}, using defaults")
-                # Define recyclable waste types
-                recyclable_types = [
-                    'plastic_bottle', 'glass_bottle', 'aluminum_can', 'paper',
-                    'cardboard', 'plastic_container', 'metal', 'tetra_pak'
-                ]
-                
                 # Provide basic guidelines if none found
                 guidelines = {
                     'waste_type': waste_type,
-                    'recyclable': waste_type in recyclable_types,
+                    'recyclable': waste_type in RECYCLABLE_TYPES,
                     'preparation': 'Clean and remove labels if possible. Ensure item is empty and dry.',
-                    'bin_color': 'blue' if waste_type in recyclable_types else 'black',
+                    'bin_color': 'blue' if waste_type in RECYCLABLE_TYPES else 'black',
                     'facts': 'Recycling helps reduce landfill waste and conserves natural resources.'
                 }
                 
@@ -1142,7 +1369,7 @@ def register_routes(app):
                 'guidelines': guidelines
             }
             app.logger.debug(f"Returning guidelines response: {response}")
-            return jsonify(response), 200
+            return cacheable(jsonify(response), config.GUIDELINES_CACHE_TTL)
             
         except Exception as e:
             app.logger.error(f"Error getting recycling guidelines: {e}", exc_info=True)
@@ -1156,40 +1383,42 @@ def register_routes(app):
     @app.route('/achievements')
     def achievements():
         """Render achievements page."""
-        if 'user_id' not in session:
+        user_id = session.get('user_id')
+        if user_id is None:
             return redirect(url_for('login'))
             
-        if not check_db():
+        db = request_db()
+        if db is None:
             flash('Service temporarily unavailable. Please try again later.', 'error')
             return redirect(url_for('home'))
             
         try:
             # Get user
-            user = db.get_user(user_id=session['user_id'])
+            user = db.get_user(user_id=user_id)
             if not user:
                 flash('User not found', 'error')
                 return redirect(url_for('logout'))
             
             # Get user stats with items_scanned and rank
-            stats = db.get_user_stats(session['user_id'])
+            stats = db.get_user_stats(user_id)
             app.logger.debug(f"Retrieved user stats for achievements: {stats}")
             if not stats:
                 app.logger.info("No stats found for user achievements, creating default stats")
                 stats = {
-                    "user_id": session['user_id'],
+                    "user_id": user_id,
                     "points": user.get('points', 0),
                     "level": user.get('level', 'Beginner'),
                     "rank": 1,
                     "next_level": "Intermediate",
                     "points_to_next_level": 100,
                     "level_progress": 0,
-                    "items_scanned": db.count_user_scans(session['user_id'])
+                    "items_scanned": db.count_user_scans(user_id)
                 }
             else:
                 # Ensure items_scanned is populated
                 if 'items_scanned' not in stats or stats['items_scanned'] is None:
                     app.logger.debug("items_scanned not in stats, adding from scan count")
-                    stats['items_scanned'] = db.count_user_scans(session['user_id'])
+                    stats['items_scanned'] = db.count_user_scans(user_id)
                     app.logger.debug(f"Set items_scanned to {stats['items_scanned']}")
                 
             # Get achievements (mock data for now)
@@ -1260,6 +1489,7 @@ def register_routes(app):
             }
             
             # Update user's location in database if logged in
+            db = request_db()
             if 'user_id' in session and db:
                 try:
                     # Fix the method call - it takes 3 args (self, user_id, location_dict)
@@ -0,0 +1,115 @@
+"""
+Background scan analysis jobs for RecycleRight web interface.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Redis is optional; without it a job can only be polled from the process that ran it
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# State of a job as seen by a poller; result is (response, status) once done
+ScanJob = namedtuple('ScanJob', ['done', 'result'])
+
+class ScanJobQueue:
+    """Runs scan analyses on a thread pool and keeps their results for polling."""
+    
+    def __init__(self, max_workers=4, result_ttl=600, redis_url=None):
+        """
+        Initialize the job queue.
+        
+        Args:
+            max_workers (int): Number of analysis threads.
+            result_ttl (int): Seconds a job and its result are kept.
+            redis_url (str, optional): Redis URL for sharing job state across worker processes.
+        """
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scan')
+        self._redis = redis.Redis.from_url(redis_url) if redis_url and redis is not None else None
+        
+        # Jobs kept in memory when Redis is not available: job_id -> (expires, entry)
+        self._jobs = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, user_id, fn, *args):
+        """
+        Run fn(*args) in the background.
+        
+        Args:
+            user_id (str): User the job belongs to; only they can read its result.
+            fn (callable): Analysis returning a (response, status) tuple.
+        
+        Returns:
+            str: Job ID to poll with get().
+        """
+        job_id = uuid.uuid4().hex
+        self._store(job_id, (user_id, False, None))
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self._finish(job_id, user_id, f))
+        return job_id
+    
+    def get(self, job_id, user_id):
+        """
+        Look up a job.
+        
+        Args:
+            job_id (str): Job ID returned by submit().
+            user_id (str): User polling for the job.
+        
+        Returns:
+            ScanJob: The job's state, or None if it is unknown, expired or belongs to
+                another user.
+        """
+        # Entries only land in memory when Redis can't take them, so they are the newest
+        with self._lock:
+            expires, entry = self._jobs.get(job_id, (0, None))
+        if expires < time.monotonic():
+            entry = None
+        if entry is None and self._redis is not None:
+            try:
+                cached = self._redis.get(f"scan:{job_id}")
+                if cached is not None:
+                    entry = json.loads(cached)
+            except (redis.RedisError, ValueError) as e:
+                logger.warning(f"Error reading scan job {job_id}: {e}")
+        
+        if entry is None:
+            return None
+        # JSON hands the entry and result back as lists
+        owner, done, result = entry
+        if owner != user_id:
+            return None
+        return ScanJob(done=done, result=tuple(result) if result is not None else None)
+    
+    def _finish(self, job_id, user_id, future):
+        """Store the result of a finished job."""
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Scan job {job_id} failed: {e}", exc_info=True)
+            result = ({'success': False, 'error': 'Error processing image. Please try again.'}, 500)
+        self._store(job_id, (user_id, True, result))
+    
+    def _store(self, job_id, entry):
+        """Save a job entry of (user_id, done, result) for result_ttl seconds."""
+        if self._redis is not None:
+            try:
+                self._redis.setex(f"scan:{job_id}", self.result_ttl, json.dumps(entry))
+                return
+            except (redis.RedisError, TypeError) as e:
+                logger.warning(f"Error storing scan job {job_id} in Redis: {e}")
+        
+        with self._lock:
+            now = time.monotonic()
+            self._jobs = {key: job for key, job in self._jobs.items() if job[0] >= now}
+            self._jobs[job_id] = (now + self.result_ttl, entry)
@@ -8,7 +8,6 @@ import sys
 import json
 import base64
 import cv2
-import numpy as np
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
 from werkzeug.utils import secure_filename
@@ -27,7 +26,7 @@ config = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(config)
 
 # Now import the rest of the modules
-from models.waste_classifier import WasteClassifier
+from models.waste_classifier import WasteClassifier, decode_image
 from data.database import get_db
 from data.recycling_guidelines import RecyclingGuidelines
 from api.geolocation import GeolocationService
@@ -59,7 +58,7 @@ challenges = ChallengeSystem(get_db())
 
 # File upload settings
 UPLOAD_FOLDER = os.path.join(config.ASSETS_DIR, "uploads")
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif'})
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
@@ -67,8 +66,8 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max-limit
 
 def allowed_file(filename):
     """Check if file has an allowed extension."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, dot, extension = filename.rpartition('.')
+    return bool(dot) and extension.lower() in ALLOWED_EXTENSIONS
 
 @app.route('/')
 def index():
@@ -79,13 +78,19 @@ def index():
 def login():
     """Handle user login."""
     if request.method == 'POST':
-        username = request.form.get('username')
-        password = request.form.get('password')
+        form = request.form
+        username = form.get('username')
+        password = form.get('password')
         
         db = get_db()
         user = db.get_user(username=username)
         
         if user and check_password_hash(user['password_hash'], password):
+            # Rehash passwords stored with an older method now that we have the plaintext
+            if not user['password_hash'].startswith(config.PASSWORD_HASH_METHOD + '$'):
+                db.update_user_password_hash(
+                    user['id'], generate_password_hash(password, method=config.PASSWORD_HASH_METHOD)
+                )
             session['user_id'] = user['id']
             session['username'] = user['username']
             flash('Login successful!', 'success')
@@ -99,9 +104,10 @@ def login():
 def register():
     """Handle user registration."""
     if request.method == 'POST':
-        username = request.form.get('username')
-        email = request.form.get('email')
-        password = request.form.get('password')
+        form = request.form
+        username = form.get('username')
+        email = form.get('email')
+        password = form.get('password')
         
         if not username or not email or not password:
             flash('All fields are required', 'danger')
@@ -116,7 +122,7 @@ def register():
             return render_template('register.html')
         
         # Hash password and create user
-        password_hash = generate_password_hash(password)
+        password_hash = generate_password_hash(password, method=config.PASSWORD_HASH_METHOD)
         user_id = db.add_user(username=username, email=email, password_hash=password_hash)
         
         if user_id:
@@ -195,7 +201,7 @@ def scan_upload():
         # Add timestamp to filename to avoid collisions
         filename = f"{timestamp}_{filename}"
         filepath = os.path.join(user_folder, filename)
-        file.save(filepath)
+        file.save(filepath, buffer_size=1 << 20)
         
         # Process the image
         result = process_image(filepath)
@@ -231,9 +237,8 @@ def scan_camera():
     with open(filepath, 'wb') as f:
         f.write(image_data)
     
-    # Convert to OpenCV format
-    nparr = np.frombuffer(image_data, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    # Convert to OpenCV format, decoding at reduced resolution
+    img = decode_image(image_data)
     
     # Process the image
     result = process_image(filepath, img)